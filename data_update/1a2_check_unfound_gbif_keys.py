@@ -11,7 +11,6 @@ import pandas as pd
 import os
 import sys
 import dotenv
-import pygbif.species as gbif
 import pytaxize.gn as gn
 import numpy as np
 
@@ -3,6 +3,7 @@ File: data_update/2_new_gbif_obs.py
 Author: Ariel Saffer
 Date created: 2023-04-14
 Description: Get the new GBIF observations for all species, only since most recent data queried
+    Run with --resume to continue an interrupted run from its checkpoint file
 """
 
 import pandas as pd
@@ -14,7 +15,13 @@ from datetime import date
 
 sys.path.append(os.getcwd())
 
-from data_update.data_functions import write_gbif_counts, call_gbif_api
+from data_update.gbif_counts import (
+    write_gbif_counts,
+    fetch_gbif_counts,
+    fetch_gbif_counts_faceted,
+    GBIF_WORKERS,
+    GBIF_RATE_LIMIT,
+)
 
 # Load variables and paths from .env
 
@@ -22,6 +29,23 @@ dotenv.load_dotenv(".env")
 data_dir = os.getenv("DATA_PATH")
 last_update = os.getenv("GBIF_OBS_UPDATED")
 base_year = int(os.getenv("BASE_OBS_YEAR"))
+# Concurrent API calls, and API calls per second for all of them together
+workers = int(os.getenv("GBIF_WORKERS", GBIF_WORKERS))
+rate_limit = float(os.getenv("GBIF_RATE_LIMIT", GBIF_RATE_LIMIT))
+# "faceted" to get all years of a species in a few calls, or "yearly" for one call per year
+request_mode = os.getenv("GBIF_REQUEST_MODE", "faceted")
+# Times failed API calls are sent again before giving up
+retries = int(os.getenv("GBIF_RETRIES", 2))
+
+# Results of API calls are saved here as they arrive, to resume interrupted runs
+checkpoint = data_dir + "GBIF data/intermediate_files/gbif_obs_checkpoint.jsonl"
+resume = "--resume" in sys.argv[1:]
+if os.path.exists(checkpoint) and not resume:
+    print(
+        "Found a checkpoint of a previous run: starting over (use --resume to continue it)"
+    )
+    os.remove(checkpoint)
+os.makedirs(os.path.dirname(checkpoint), exist_ok=True)
 
 # Get today's date
 today = date.today()
@@ -96,37 +120,65 @@ species_years += list(itertools.product(*species_year))
 
 api_calls_df = pd.DataFrame(species_years, columns=["species", "years"])
 
-# Writing out the API calls
-api_calls_df["api_call"] = api_calls_df.apply(write_gbif_counts, axis=1)
+if request_mode == "faceted":
+    # Get all years of each species with country and year facets
 
-# Send API calls
+    print(
+        f"Getting counts for {len(api_calls_df.index)} species-years..."
+        f" ({workers} calls at a time, at most {rate_limit:g} per second)"
+    )
 
-print(f"Prepared {len(api_calls_df.api_call)} API calls...")
+    all_counts, failed_calls = fetch_gbif_counts_faceted(
+        api_calls_df,
+        workers=workers,
+        rate=rate_limit,
+        checkpoint=checkpoint,
+        retries=retries,
+    )
 
-results = []
+else:
+    # Writing out the API calls
+    api_calls_df["api_call"] = api_calls_df.apply(write_gbif_counts, axis=1)
 
-for i, call in enumerate(api_calls_df.api_call):
-    try:
-        result = call_gbif_api(call)
-    except:
-        print(f"Failed on API call {i}!")
-        result = "Failed"  # Placeholder for failed API calls
-    results.append(result)
-    if i % 100 == 0:
-        print(f"{i} out of {len(api_calls_df.api_call)} API calls done!")
+    # Send API calls
 
+    print(
+        f"Prepared {len(api_calls_df.api_call)} API calls..."
+        f" ({workers} at a time, at most {rate_limit:g} per second)"
+    )
 
-# Reformat country/count data into dataframe rows per entry
+    results = fetch_gbif_counts(
+        api_calls_df.api_call.tolist(),
+        workers=workers,
+        rate=rate_limit,
+        checkpoint=checkpoint,
+        retries=retries,
+    )
+    failed_calls = [
+        call
+        for call, result in zip(api_calls_df.api_call, results)
+        if result == "Failed"
+    ]
+
+    # Reformat country/count data into dataframe rows per entry
+
+    api_calls_df["result"] = results
+    api_calls_df[["country", "counts"]] = api_calls_df.result.apply(pd.Series)
+
+    all_counts = (
+        api_calls_df.drop(columns="result")
+        .set_index(["species", "years", "api_call"])
+        .apply(pd.Series.explode)
+        .reset_index()
+    )
 
-api_calls_df["result"] = results
-api_calls_df[["country", "counts"]] = api_calls_df.result.apply(pd.Series)
+# Don't write incomplete results: the failed calls are re-issued with --resume
 
-all_counts = (
-    api_calls_df.drop(columns="result")
-    .set_index(["species", "years", "api_call"])
-    .apply(pd.Series.explode)
-    .reset_index()
-)
+if len(failed_calls) > 0:
+    sys.exit(
+        f"{len(failed_calls)} API calls failed after {retries} retries."
+        " Run again with --resume to send only the failed calls."
+    )
 
 # Set species datatype to integer and then string
 
@@ -211,3 +263,8 @@ new_keys.to_csv(data_dir + "species lists/new/new_usageKeys.csv", index=False)
 
 os.environ["GBIF_OBS_UPDATED"] = f"{today.year}-{today.month:02d}-{today.day:02d}"
 dotenv.set_key(".env", "GBIF_OBS_UPDATED", os.environ["GBIF_OBS_UPDATED"])
+
+# The run is complete, so the checkpoint is no longer needed
+
+if os.path.exists(checkpoint):
+    os.remove(checkpoint)
@@ -0,0 +1,131 @@
+"""
+File: data_update/2b_gbif_download_first_records.py
+Author: GIATAR team
+Date created: 2026-10-17
+Description: Get GBIF first records from a GBIF occurrence download (SIMPLE_CSV or Darwin Core Archive zip) instead of the count API calls of 2_new_gbif_obs.py
+    Run with the path of the zip, e.g. python data_update/2b_gbif_download_first_records.py 0012345-260101000000000.zip
+    A SIMPLE_CSV download has no genus, family, ... keys, so taxa above species rank are looked up with the API instead
+"""
+
+import pandas as pd
+import itertools
+import sys
+import os
+import dotenv
+from datetime import date
+
+sys.path.append(os.getcwd())
+
+from data_update.gbif_counts import (
+    gbif_download_first_records,
+    fetch_gbif_counts_faceted,
+    GBIF_WORKERS,
+    GBIF_RATE_LIMIT,
+)
+
+# Load variables and paths from .env
+
+dotenv.load_dotenv(".env")
+data_dir = os.getenv("DATA_PATH")
+base_year = int(os.getenv("BASE_OBS_YEAR"))
+# Concurrent API calls, and API calls per second for all of them together
+workers = int(os.getenv("GBIF_WORKERS", GBIF_WORKERS))
+rate_limit = float(os.getenv("GBIF_RATE_LIMIT", GBIF_RATE_LIMIT))
+retries = int(os.getenv("GBIF_RETRIES", 2))
+
+if len(sys.argv) < 2:
+    sys.exit("Please give the path of the GBIF download zip")
+zip_path = sys.argv[1]
+
+# Start with master list, without usageKeys that start with X
+
+species_list = pd.read_csv(
+    data_dir + "link files/all_usageKeys.csv", dtype={"usageKey": str}
+)
+species_list = species_list[~species_list["usageKey"].str.startswith("X")]
+usageKeys = [str(int(float(x))) for x in species_list["usageKey"].unique()]
+
+# Taxon rank of each usageKey, to match genera, families, ... to their species
+
+invasive_all_source = pd.read_csv(
+    data_dir + "species lists/invasive_all_source.csv",
+    dtype={"usageKey": str},
+    usecols=["usageKey", "rank"],
+)
+invasive_all_source = invasive_all_source.dropna()
+ranks = dict(zip(invasive_all_source["usageKey"], invasive_all_source["rank"]))
+
+print(f"Reading occurrences of {len(usageKeys)} species from {zip_path}...")
+
+first_records, api_usageKeys = gbif_download_first_records(
+    zip_path, usageKeys, base_year, ranks
+)
+
+# Taxa above species rank that the download can't match: use the count API calls
+
+if len(api_usageKeys) > 0:
+    current_year = date.today().year
+    print(
+        f"Warning: the download has no key columns for the ranks of {len(api_usageKeys)}"
+        " taxa (e.g. genusKey in a SIMPLE_CSV download). Getting their counts from the"
+        " GBIF API..."
+    )
+    species_years = pd.DataFrame(
+        itertools.product(
+            [int(key) for key in api_usageKeys], range(base_year, current_year + 1)
+        ),
+        columns=["species", "years"],
+    )
+    api_counts, failed_calls = fetch_gbif_counts_faceted(
+        species_years, workers=workers, rate=rate_limit, retries=retries
+    )
+    if len(failed_calls) > 0:
+        sys.exit(f"{len(failed_calls)} API calls failed after {retries} retries.")
+
+    api_counts = api_counts.loc[api_counts["country"].notnull()]
+    api_counts["species"] = api_counts["species"].astype(str)
+    api_first_records = (
+        api_counts[["species", "country", "years"]]
+        .groupby(by=["species", "country"], as_index=False)
+        .min()
+    )
+    first_records = pd.concat([first_records, api_first_records]).sort_values(
+        ["species", "country"], ignore_index=True
+    )
+
+# Save to CSV
+
+first_records.to_csv(data_dir + "GBIF data/new_GBIF_first_records.csv", index=False)
+
+# Consolidate with and replace previous first records
+
+previous_first_records = pd.read_csv(
+    data_dir + "GBIF data/GBIF_first_records.csv", dtype={"usageKey": str}
+)
+
+first_records = (
+    pd.concat([previous_first_records, first_records])
+    .reset_index(drop=True)
+    .drop_duplicates()
+)
+
+# Set species datatype to integer and then string
+
+first_records["species"] = first_records["species"].astype(int).astype(str)
+
+# Regroup by species and country to get the earliest first record
+
+first_records = (
+    first_records[["species", "country", "years"]]
+    .groupby(by=["species", "country"], as_index=False)
+    .min()
+)
+
+# Save to CSV
+
+first_records.to_csv(data_dir + "GBIF data/GBIF_first_records.csv", index=False)
+
+print(
+    f"GBIF download included {len(first_records.index)} first records"
+    f" for {len(first_records.species.unique())} species."
+)
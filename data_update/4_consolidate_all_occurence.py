@@ -15,6 +15,10 @@ import re
 sys.path.append(os.getcwd())
 
 from data_update.data_functions import clean_DAISIE_year, match_countries
+from query_functions.python.GIATAR_query_functions import (
+    apply_schema,
+    write_native_status,
+)
 
 # Get data dir - invasive database folder
 dotenv.load_dotenv(".env")
@@ -574,6 +578,10 @@ all_records["usageKey"] = all_records["usageKey"].str.replace("\.0", "", regex=T
 # Exclude rows with NA in usageKey
 all_records = all_records.loc[all_records["usageKey"].notna()]
 
+# Use the compact dtypes of the query functions (categorical usageKey, ISO3, Source
+# and Type, Int16 year, boolean Native) to cut the memory used by the rest of the script
+all_records = apply_schema(all_records, report=True, name="all_records")
+
 # Clean the Reference column
 # Replace "\n*" in the Reference column with "; "
 all_records["Reference"] = all_records["Reference"].str.replace(
@@ -593,15 +601,16 @@ all_records.to_csv(data_dir + "occurrences/all_records.csv", index=False)
 print("All records and individual source first records saved to .csv")
 
 # If a record is the native range, it should be the earliest
-# Set year temporarily to -99999
+# Set year temporarily to -9999 (years are 16-bit integers, so it must be above -32768)
+native_year = -9999
 
-all_records.loc[all_records["Native"] == True, "year"] = -99999
+all_records.loc[all_records["Native"].eq(True).fillna(False), "year"] = native_year
 
 # Get a dataset of the earliest record by species-country
 
 first_records = (
     all_records[["usageKey", "ISO3", "year"]]
-    .groupby(by=["usageKey", "ISO3"], as_index=False)
+    .groupby(by=["usageKey", "ISO3"], as_index=False, observed=True)
     .min()
 )
 
@@ -699,10 +708,22 @@ first_records = first_records.merge(all_references, on="Combo_ID", how="left")
 # Drop the combo ID column
 first_records.drop(columns=["Combo_ID"], inplace=True)
 
-# Set any years that are -99999 to NA
-first_records.loc[first_records["year"] == -99999, "year"] = np.nan
+# Set any years that are -9999 to NA
+first_records.loc[first_records["year"].eq(native_year).fillna(False), "year"] = np.nan
 
 # Write to csv
 first_records.to_csv(data_dir + "occurrences/first_records.csv", index=False)
 
 print(f"{len(first_records.index)} first records saved to .csv!")
+
+# Resolve the native status of every species-country pair in all_records once, so
+# the query functions look it up instead of joining the records, native ranges and
+# bioregion crosswalk on every call
+
+print("Resolving native status of all species-country pairs...")
+
+native_status = write_native_status(data_dir)
+
+print(
+    f"{len(native_status.index)} species-country native statuses saved to occurrences/native_status.parquet!"
+)
@@ -0,0 +1,26 @@
+"""
+File: data_update/6_write_parquet_snapshot.py
+Author: GIATAR team
+Date created: 2026-10-17
+Description: Write a typed Parquet copy of all dataset tables (with a manifest) for faster loading by the query functions
+"""
+
+import os
+import sys
+import dotenv
+
+sys.path.append(os.getcwd())
+
+from query_functions.python.GIATAR_query_functions import write_parquet_snapshot
+
+# Get data dir - invasive database folder
+dotenv.load_dotenv(".env")
+data_dir = os.getenv("DATA_PATH")
+
+print("Writing Parquet snapshot of all tables...")
+
+manifest = write_parquet_snapshot(data_dir)
+
+print(
+    f"Snapshot complete! Tables: {len(manifest['files'])}, Rows: {sum(entry['rows'] for entry in manifest['files'].values())}"
+)
@@ -0,0 +1,24 @@
+"""
+File: data_update/7_write_sqlite_database.py
+Author: GIATAR team
+Date created: 2026-10-17
+Description: Write all dataset tables, with indexes, to a SQLite database for the "sqlite" backend of the query functions
+"""
+
+import os
+import sys
+import dotenv
+
+sys.path.append(os.getcwd())
+
+from query_functions.python.GIATAR_query_functions import write_sqlite_database
+
+# Get data dir - invasive database folder
+dotenv.load_dotenv(".env")
+data_dir = os.getenv("DATA_PATH")
+
+print("Writing SQLite database of all tables...")
+
+counts = write_sqlite_database(data_dir)
+
+print(f"Database complete! Tables: {len(counts)}, Rows: {sum(counts.values())}")
@@ -9,11 +9,7 @@ import pandas as pd
 import numpy as np
 
 import requests
-from urllib.request import urlopen
 from bs4 import BeautifulSoup
-import ssl
-import urllib
-from time import sleep
 from datetime import date
 
 import pycountry
@@ -22,12 +18,10 @@ import spacy
 import regex as re
 import os
 import dotenv
-from tenacity import retry, stop_after_attempt, wait_fixed, retry_if_exception_type
-from pygbif import species
-from urllib.error import HTTPError
-from urllib3 import Timeout
 from io import StringIO
 
+from data_update import http_client
+
 
 dotenv.load_dotenv(".env")
 
@@ -36,10 +30,6 @@ data_dir = os.getenv("DATA_PATH")
 # Get today's date as date updated
 today = date.today()
 
-ctx = ssl.create_default_context()
-ctx.check_hostname = False
-ctx.verify_mode = ssl.CERT_NONE
-
 ### EPPO functions
 
 # Define all query options
@@ -61,17 +51,7 @@ def eppo_api(code, query, token):
     call = f"{root}{code}{query}{auth}"
 
     # Get the API call response
-    try:
-        response = requests.get(call).json()
-    except requests.exceptions.RequestException:
-        print("Just a second...")
-        sleep(5)
-        try:
-            response = requests.get(call, verify=False).json()
-        except requests.exceptions.RequestException:
-            print("Trying a minute...")
-            sleep(20)
-            response = requests.get(call).json()
+    response = http_client.get_json(call)
     # Process the response
 
     try:
@@ -103,17 +83,7 @@ def eppo_cat_api(code, token):
 
     root = "https://data.eppo.int/api/rest/1.0/taxon/"
     auth = f"?authtoken={token}"
-    try:
-        response = requests.get(f"{root}{code}{categorization}{auth}").json()
-    except requests.exceptions.RequestException:
-        sleep(5)
-        try:
-            response = requests.get(
-                f"{root}{code}{categorization}{auth}", verify=False
-            ).json()
-        except requests.exceptions.RequestException:
-            sleep(20)
-            response = requests.get(f"{root}{code}{categorization}{auth}").json()
+    response = http_client.get_json(f"{root}{code}{categorization}{auth}")
     return response
 
 
@@ -123,15 +93,9 @@ def eppo_cat_api(code, token):
 def scrape_eppo_reports_species(code):
     # Ignore SSL certificate errors
     url = f"https://gd.eppo.int/taxon/{code}/reporting"
-    try:
-        html = urlopen(url, context=ctx).read()
-    except urllib.error.HTTPError as err:
-        if err.code == 404:
-            return np.nan
-        else:
-            print("Waiting a moment...")
-            sleep(25)
-            html = urlopen(url, context=ctx).read()
+    html = http_client.get_page(url)
+    if html is None:
+        return np.nan
 
     soup = BeautifulSoup(html, "html.parser")
 
@@ -290,15 +254,9 @@ def country_from_eppo_reports(section_table):
 def scrape_monthly_eppo_report(year, month):
     # Ignore SSL certificate errors
     url = f"https://gd.eppo.int/reporting/Rse-{year}-{month}"
-    try:
-        html = urlopen(url, context=ctx).read()
-    except urllib.error.HTTPError as err:
-        if err.code == 404:
-            return np.nan
-        else:
-            print("Waiting a moment...")
-            sleep(25)
-            html = urlopen(url, context=ctx).read()
+    html = http_client.get_page(url)
+    if html is None:
+        return np.nan
 
     soup = BeautifulSoup(html, "html.parser")
 
@@ -357,15 +315,9 @@ def get_species(title):
 
 def get_distribution_data(url):
     # Ignore SSL certificate errors
-    try:
-        html = urlopen(url, context=ctx).read()
-    except urllib.error.HTTPError as err:
-        if err.code == 404:
-            return np.nan
-        else:
-            print("Waiting a moment...")
-            sleep(25)
-            html = urlopen(url, context=ctx).read()
+    html = http_client.get_page(url)
+    if html is None:
+        return np.nan
 
     soup = BeautifulSoup(html, "html.parser")
     soup_text = soup.text
@@ -446,15 +398,9 @@ def get_distribution_data(url):
 def scrape_eppo_distribution_species(code):
     # Ignore SSL certificate errors
     url = f"https://gd.eppo.int/taxon/{code}/distribution"
-    try:
-        html = urlopen(url, context=ctx).read()
-    except urllib.error.HTTPError as err:
-        if err.code == 404:
-            return np.nan
-        else:
-            print("Waiting a moment...")
-            sleep(25)
-            html = urlopen(url, context=ctx).read()
+    html = http_client.get_page(url)
+    if html is None:
+        return np.nan
 
     soup = BeautifulSoup(html, "html.parser")
 
@@ -502,16 +448,7 @@ def write_gbif_match(species):
 
 
 def call_gbifmatch_api(call):
-    # To deal with API response/retry errors - probably a better way to do this
-    try:
-        response = requests.get(call).json()
-    except requests.exceptions.RequestException:
-        sleep(5)
-        try:
-            response = requests.get(call, verify=False).json()
-        except requests.exceptions.RequestException:
-            sleep(20)
-            response = requests.get(call).json()
+    response = http_client.get_json(call)
     # If a match is found, unpack. If not, fill None
     try:
         usageKey = response["usageKey"]
@@ -557,43 +494,6 @@ def gbif_species_match(df):
     df.drop(columns=["responses", "api_call"], inplace=True)
 
 
-# GBIF API call: occurrence status = present, count for each species/year, for all countries
-
-
-def write_gbif_counts(df):
-    call = f"https://api.gbif.org/v1/occurrence/search?year={df['years']}&occurrence_status=present&taxonKey={df['species']}&facet=country&facetlimit=300&limit=0"
-    return call
-
-
-# Unpack the response (JSON) into just the country - count values
-def call_gbif_api(call):
-    try:
-        response = requests.get(call).json()
-    except requests.exceptions.RequestException:
-        print("Just a second...")
-        sleep(5)
-        try:
-            response = requests.get(call, verify=False).json()
-        except requests.exceptions.RequestException:
-            print("Trying a minute...")
-            sleep(60)
-            try:
-                response = requests.get(call).json()
-            except requests.exceptions.RequestException:
-                print(
-                    "Something seems to be wrong with the server... let's take a break."
-                )
-                sleep(3600)
-                response = requests.get(call).json()
-    response_vals = response["facets"][0]["counts"]
-    country = []
-    counts = []
-    for i in range(0, len(response_vals)):
-        country.append(response_vals[i]["name"])
-        counts.append(response_vals[i]["count"])
-    return [country, counts]
-
-
 ### CABI functions
 
 
@@ -603,21 +503,13 @@ def CABI_scrape_invasive(CABI_species):
         url = f"https://www.cabi.org/isc/datasheet/{code}"
         # url = input('Enter - ')
         try:
-            html = urlopen(url, context=ctx).read()
-        except (urllib.error.HTTPError, urllib.error.URLError):
-            print("Just a moment...")
-            sleep(5)
-            try:
-                html = urlopen(url, context=ctx).read()
-            except (urllib.error.HTTPError, urllib.error.URLError):
-                print("May be a minute...")
-                sleep(20)
-                try:
-                    html = urlopen(url, context=ctx).read()
-                except (urllib.error.HTTPError, urllib.error.URLError):
-                    print("It's a real webpage error!")
-                    CABI_species.loc[i, "invasive"] = "Webpage error"
-                    continue
+            html = http_client.get_page(url)
+        except requests.exceptions.RequestException:
+            html = None
+        if html is None:
+            print("It's a real webpage error!")
+            CABI_species.loc[i, "invasive"] = "Webpage error"
+            continue
 
         soup = BeautifulSoup(html, "html.parser")
 
@@ -871,14 +763,21 @@ def match_countries(df):
 ### Author: Thom Worm
 
 
-# Retry decorator to handle HTTP and timeout errors
-@retry(
-    stop=stop_after_attempt(5),
-    wait=wait_fixed(5),
-    retry=retry_if_exception_type((HTTPError, Timeout)),
-)
+# GBIF backbone match of a name (as pygbif's species.name_backbone), retried by http_client
 def get_species_name_backbone(taxon, strict):
-    return species.name_backbone(taxon, verbose=True, strict=strict)
+    response = http_client.get(
+        "https://api.gbif.org/v1/species/match",
+        params={"name": taxon, "verbose": "true", "strict": str(strict).lower()},
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+# GBIF name usage of a key (as pygbif's species.name_usage)
+def get_species_name_usage(key):
+    response = http_client.get(f"https://api.gbif.org/v1/species/{key}")
+    response.raise_for_status()
+    return response.json()
 
 
 def strip_author_name(taxon):
@@ -934,7 +833,7 @@ def check_gbif_tax_secondary(dat):
         )
         try:
             db_all = get_species_name_backbone(taxon, strict=True)
-        except (HTTPError, Timeout):
+        except requests.exceptions.RequestException:
             print(f"Failed to retrieve data for {taxon} after 5 attempts. Skipping.")
             continue
         db = {k: v for k, v in db_all.items() if k != "alternatives"}
@@ -1008,7 +907,7 @@ def check_gbif_tax_secondary(dat):
                     db_all_2 = get_species_name_backbone(
                         dat.loc[ind_tax, "Taxon"].iloc[0], strict=True
                     )
-                except (HTTPError, Timeout):
+                except requests.exceptions.RequestException:
                     print(
                         f"Failed to retrieve data for {dat.loc[ind_tax, 'Taxon'].iloc[0]} after 5 attempts. Skipping."
                     )
@@ -1040,7 +939,7 @@ def check_gbif_tax_secondary(dat):
                     db_all_2 = get_species_name_backbone(
                         dat.loc[ind_tax, "Taxon"].iloc[0], strict=True
                     )
-                except (HTTPError, Timeout):
+                except requests.exceptions.RequestException:
                     print(
                         f"Failed to retrieve data for {dat.loc[ind_tax, 'Taxon'].iloc[0]} after 5 attempts. Skipping."
                     )
@@ -1057,7 +956,7 @@ def check_gbif_tax_secondary(dat):
                 db_all_2 = get_species_name_backbone(
                     strip_author_name(taxon), strict=True
                 )
-            except (HTTPError, Timeout):
+            except requests.exceptions.RequestException:
                 print(
                     f"Failed to retrieve data for {strip_author_name(taxon)} after 5 attempts. Skipping."
                 )
@@ -1086,7 +985,7 @@ def check_gbif_tax_secondary(dat):
             print(taxon_binom)
             try:
                 db_binom = get_species_name_backbone(taxon_binom, strict=True)
-            except (HTTPError, Timeout):
+            except requests.exceptions.RequestException:
                 print(
                     f"Failed to retrieve data for {taxon_binom} after 5 attempts. Skipping."
                 )
@@ -1116,8 +1015,8 @@ def check_gbif_tax_secondary(dat):
                 and ("species" in db_2 or "genus" in db_2)
             ):
                 try:
-                    accepted_db = species.name_usage(key=db_2.get("acceptedUsageKey"))
-                except (HTTPError, Timeout):
+                    accepted_db = get_species_name_usage(db_2.get("acceptedUsageKey"))
+                except requests.exceptions.RequestException:
                     print(
                         f"Failed to retrieve data for {db_2.get('acceptedUsageKey')} after 5 attempts. Skipping."
                     )
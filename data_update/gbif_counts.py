@@ -0,0 +1,500 @@
+"""
+File: data_update/gbif_counts.py
+Author: GIATAR team
+Date created: 2026-10-17
+Description: GBIF occurrence counts for the data_update scripts: concurrent, rate-limited and resumable API calls, and first records from an occurrence download
+"""
+
+import pandas as pd
+import numpy as np
+
+from time import sleep
+import re
+import os
+import json
+import threading
+import zipfile
+
+from data_update import http_client
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import islice
+
+
+# GBIF API call: occurrence status = present, count for each species/year, for all countries
+
+
+def write_gbif_counts(df):
+    call = f"https://api.gbif.org/v1/occurrence/search?year={df['years']}&occurrence_status=present&taxonKey={df['species']}&facet=country&facetlimit=300&limit=0"
+    return call
+
+
+# Unpack the response (JSON) into just the country - count values
+def call_gbif_api(call, rate_limit=None):
+    response = http_client.get_json(call, rate_limit=rate_limit)
+    # Searches without any occurrences may have no facets
+    response_vals = response["facets"][0]["counts"] if response["facets"] else []
+    country = []
+    counts = []
+    for i in range(0, len(response_vals)):
+        country.append(response_vals[i]["name"])
+        counts.append(response_vals[i]["count"])
+    return [country, counts]
+
+
+# Default number of concurrent GBIF API calls, and calls per second shared by all of them
+GBIF_WORKERS = 8
+GBIF_RATE_LIMIT = 20
+
+# Calls submitted ahead per worker by fetch_gbif_counts, so that a long list of calls
+# isn't all held in the thread pool's queue at once
+GBIF_QUEUED_PER_WORKER = 4
+
+
+class TokenBucket:
+    """
+    A rate limit shared by several threads: on average at most `rate` calls per second,
+    with bursts of up to `capacity` calls.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        # Wait until a token is available, then take it
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity, self.tokens + (now - self.updated) * self.rate
+                )
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            sleep(wait)
+
+
+def read_gbif_checkpoint(checkpoint):
+    """
+    Read the ledger of a checkpoint file written by fetch_gbif_counts.
+
+    Returns:
+        dict: call: [country, counts] result, or "Failed", of every call in the ledger
+            (the last entry of calls that were sent more than once).
+    """
+    ledger = {}
+    if not os.path.exists(checkpoint):
+        return ledger
+    with open(checkpoint, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                # A line cut short by a crash
+                continue
+            ledger[entry["call"]] = entry.get("result", "Failed")
+    return ledger
+
+
+def fetch_gbif_counts(
+    calls,
+    workers=GBIF_WORKERS,
+    rate=GBIF_RATE_LIMIT,
+    unpack=None,
+    checkpoint=None,
+    retries=0,
+    checkpoint_every=500,
+):
+    """
+    Send GBIF occurrence count calls (see write_gbif_counts) concurrently and unpack them
+    with call_gbif_api (or `unpack`, called as unpack(call, rate_limit=...)).
+
+    The workers share the pooled connections of http_client and one rate limit, which
+    every HTTP request takes a token from (pages and retries included). Only a few calls
+    per worker are queued at once. Calls that fail are sent again up to `retries` times,
+    after all other calls, and are then returned as "Failed".
+
+    With a checkpoint file, the result of each call is appended to the file (one JSON line
+    per call, every `checkpoint_every` calls), and calls that already have a result in the
+    file are not sent again, so an interrupted run can be resumed. Calls that failed are
+    recorded too, and sent again on the next run.
+
+    Args:
+        calls (list): The API calls.
+        workers (int): The number of concurrent calls.
+        rate (float): The maximum number of HTTP requests per second, for all workers together.
+        unpack (function, optional): Sends one call, passing rate_limit on to http_client,
+            and unpacks its response. Defaults to call_gbif_api.
+        checkpoint (str, optional): Path of the checkpoint file.
+        retries (int): The number of times failed calls are sent again.
+        checkpoint_every (int): The number of results written to the checkpoint file at once.
+
+    Returns:
+        list: The [country, counts] result of each call, in the order of the calls.
+    """
+    bucket = TokenBucket(rate)
+    # Keep a connection open for each worker
+    if workers > http_client.POOL_SIZE:
+        http_client.configure(pool_size=workers)
+
+    def fetch(call):
+        return (unpack or call_gbif_api)(call, rate_limit=bucket)
+
+    done_results = {}
+    if checkpoint is not None:
+        done_results = {
+            call: result
+            for call, result in read_gbif_checkpoint(checkpoint).items()
+            if result != "Failed"
+        }
+
+    # Calls still to send, without duplicates
+    queue = [call for call in dict.fromkeys(calls) if call not in done_results]
+    if checkpoint is not None and len(queue) < len(set(calls)):
+        print(f"Resuming: {len(set(calls)) - len(queue)} API calls already done")
+    ledger_lines = []
+
+    def write_ledger():
+        if checkpoint is not None and len(ledger_lines) > 0:
+            with open(checkpoint, "a", encoding="utf-8") as f:
+                f.writelines(ledger_lines)
+            ledger_lines.clear()
+
+    for attempt in range(retries + 1):
+        if len(queue) == 0:
+            break
+        if attempt > 0:
+            print(
+                f"Retrying {len(queue)} failed API calls (retry {attempt} of {retries})..."
+            )
+
+        failed = []
+        done = 0
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # Keep GBIF_QUEUED_PER_WORKER calls per worker submitted, and submit
+            # the next call each time one is done
+            waiting = iter(queue)
+            futures = {}
+            for call in islice(waiting, workers * GBIF_QUEUED_PER_WORKER):
+                futures[executor.submit(fetch, call)] = call
+            while futures:
+                finished, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    call = futures.pop(future)
+                    for next_call in islice(waiting, 1):
+                        futures[executor.submit(fetch, next_call)] = next_call
+                    try:
+                        done_results[call] = future.result()
+                        entry = {"call": call, "result": done_results[call]}
+                    except Exception:
+                        print(f"Failed on API call {call}!")
+                        failed.append(call)
+                        entry = {"call": call, "failed": True}
+                    ledger_lines.append(json.dumps(entry) + "\n")
+                    if len(ledger_lines) >= checkpoint_every:
+                        write_ledger()
+                    # Report every 100 calls done, and the last call
+                    done += 1
+                    if done % 100 == 0 or done == len(queue):
+                        print(f"{done} out of {len(queue)} API calls done!")
+        write_ledger()
+        queue = failed
+
+    # Placeholder for failed API calls
+    return [done_results.get(call, "Failed") for call in calls]
+
+
+# GBIF API call: occurrence counts of a species for a range of years, faceted by
+# country (for all countries) or by year (for one country)
+
+GBIF_FACET_LIMIT = 300
+
+# Fewest years of a species for which the country call of fetch_gbif_counts_faceted is
+# made: with fewer years, it can't save calls
+GBIF_FACET_MIN_YEARS = 3
+
+
+def write_gbif_facet_counts(species, first_year, last_year, facet, country=None):
+    call = (
+        f"https://api.gbif.org/v1/occurrence/search?year={first_year},{last_year}"
+        f"&occurrence_status=present&taxonKey={species}&facet={facet}"
+        f"&facetlimit={GBIF_FACET_LIMIT}&limit=0"
+    )
+    if country is not None:
+        call += f"&country={country}"
+    return call
+
+
+# Send a facet call, following facetOffset until all facet values are read
+def call_gbif_facet_api(call, rate_limit=None):
+    facet_limit = int(re.search(r"facetlimit=(\d+)", call).group(1))
+    names = []
+    counts = []
+    offset = 0
+    while True:
+        page_names, page_counts = call_gbif_api(
+            f"{call}&facetOffset={offset}", rate_limit=rate_limit
+        )
+        names += page_names
+        counts += page_counts
+        if len(page_names) < facet_limit:
+            return [names, counts]
+        offset += facet_limit
+
+
+def fetch_gbif_counts_faceted(
+    species_years, workers=GBIF_WORKERS, rate=GBIF_RATE_LIMIT, **options
+):
+    """
+    Get the occurrence counts per (species, year, country) with fewer API calls than one
+    call per year.
+
+    GBIF cannot facet on year and country together, so for each species:
+        1. one call faceted by country over all its years finds the countries with occurrences,
+        2. then one call per country, faceted by year, gets the counts per year - or, if the
+           species is in as many countries as it has years, one call per year faceted by
+           country, as in write_gbif_counts.
+    Species with fewer than GBIF_FACET_MIN_YEARS years (e.g. in incremental updates),
+    for which the first call can't save calls, and species whose first call fails get
+    one call per year.
+
+    Args:
+        species_years (pd.DataFrame): The "species" (usageKey) and "years" to get counts for.
+            The years of each species must be consecutive.
+        workers (int): The number of concurrent calls.
+        rate (float): The maximum number of HTTP requests per second, for all workers together.
+        **options: checkpoint, retries and checkpoint_every options of fetch_gbif_counts.
+
+    Returns:
+        tuple: (all_counts, failed_calls):
+            all_counts (pd.DataFrame): One row per species, year and country, with the columns
+                "species", "years", "api_call" (the per-year call of write_gbif_counts),
+                "country" and "counts", and rows with a missing country for years without
+                occurrences, as from the per-year calls.
+            failed_calls (list): The calls that failed, whose counts are missing.
+    """
+    year_ranges = species_years.groupby("species", sort=False)["years"].agg(
+        ["min", "max"]
+    )
+
+    # Countries of each species over all its years, for species with enough years that
+    # this call can save calls
+    n_years = year_ranges["max"] - year_ranges["min"] + 1
+    faceted = year_ranges.loc[n_years >= GBIF_FACET_MIN_YEARS]
+    country_calls = [
+        write_gbif_facet_counts(usageKey, first_year, last_year, "country")
+        for usageKey, (first_year, last_year) in faceted.iterrows()
+    ]
+    print(f"Getting the countries of {len(country_calls)} species...")
+    country_results = dict(
+        zip(
+            faceted.index,
+            fetch_gbif_counts(
+                country_calls, workers, rate, unpack=call_gbif_facet_api, **options
+            ),
+        )
+    )
+
+    # Per-year counts: one call per country, or one call per year
+    calls = []
+    for usageKey, (first_year, last_year) in year_ranges.iterrows():
+        n_years = last_year - first_year + 1
+        result = country_results.get(usageKey, "Failed")
+        if result != "Failed" and len(result[0]) < n_years:
+            for country in result[0]:
+                calls.append(
+                    (
+                        usageKey,
+                        country,
+                        write_gbif_facet_counts(
+                            usageKey, first_year, last_year, "year", country
+                        ),
+                    )
+                )
+        else:
+            for year in range(first_year, last_year + 1):
+                calls.append(
+                    (
+                        usageKey,
+                        year,
+                        write_gbif_counts({"species": usageKey, "years": year}),
+                    )
+                )
+    print(
+        f"Getting counts with {len(calls)} API calls, {len(country_calls) + len(calls)}"
+        f" in all (instead of {len(species_years.index)} calls by year)..."
+    )
+    results = fetch_gbif_counts(
+        [call for _, _, call in calls],
+        workers,
+        rate,
+        unpack=call_gbif_facet_api,
+        **options,
+    )
+
+    # (usageKey, year): list of (country, count)
+    counts = {}
+    failed_calls = []
+    for (usageKey, key, call), result in zip(calls, results):
+        if result == "Failed":
+            failed_calls.append(call)
+            continue
+        if isinstance(key, str):
+            # Faceted by year for one country
+            for year, count in zip(*result):
+                counts.setdefault((usageKey, int(year)), []).append((key, count))
+        else:
+            # Faceted by country for one year
+            counts.setdefault((usageKey, key), []).extend(zip(*result))
+
+    rows = []
+    for usageKey, year in zip(species_years["species"], species_years["years"]):
+        api_call = write_gbif_counts({"species": usageKey, "years": year})
+        year_counts = counts.get((usageKey, year), [])
+        # Same order as the country facet of one year: by decreasing count
+        for country, count in sorted(year_counts, key=lambda c: (-c[1], c[0])):
+            rows.append((usageKey, year, api_call, country, count))
+        if len(year_counts) == 0:
+            rows.append((usageKey, year, api_call, np.nan, np.nan))
+
+    # Keep counts as integers next to the missing values, as in the per-year results
+    all_counts = pd.DataFrame(
+        rows, columns=["species", "years", "api_call", "country", "counts"], dtype=object
+    ).astype({"species": int, "years": int})
+    return all_counts, failed_calls
+
+
+# GBIF occurrence download (SIMPLE_CSV or Darwin Core Archive format): earliest year of
+# each species in each country, as from the occurrence count API calls
+
+# Columns of a download that hold the key of an occurrence's taxon at each rank
+GBIF_RANK_KEY_COLUMNS = {
+    "KINGDOM": "kingdomKey",
+    "PHYLUM": "phylumKey",
+    "CLASS": "classKey",
+    "ORDER": "orderKey",
+    "FAMILY": "familyKey",
+    "GENUS": "genusKey",
+    "SUBGENUS": "subgenusKey",
+    "SPECIES": "speciesKey",
+}
+
+# Columns that hold the key of the occurrence's own taxon
+GBIF_TAXON_KEY_COLUMNS = ["taxonKey", "acceptedTaxonKey"]
+
+
+def gbif_download_first_records(
+    zip_path, usageKeys, base_year, ranks=None, chunksize=1000000
+):
+    """
+    Get the first records (earliest year of each species in each country) from a GBIF
+    occurrence download, reading the zip in chunks.
+
+    Only the taxon key columns, countryCode, year and occurrenceStatus are read. As in
+    the count API calls (occurrence_status=present&taxonKey=...), an occurrence counts
+    for a usageKey if it is present and the usageKey is its taxon or one of the taxa
+    above it. A usageKey of a given rank can only be matched to the occurrences of
+    lower taxa if the download has the key column of that rank (GBIF_RANK_KEY_COLUMNS):
+    a SIMPLE_CSV download only has speciesKey, and a Darwin Core Archive has all of them.
+    usageKeys whose rank column is missing are not looked up in the download, and are
+    returned so that their counts can be requested from the API instead. Occurrences
+    without a country or before base_year are left out.
+
+    Args:
+        zip_path (str): Path of the download zip.
+        usageKeys (list): The usageKeys of the species to keep.
+        base_year (int): The first year of observations.
+        ranks (dict, optional): usageKey: taxon rank (e.g. "GENUS"). usageKeys without
+            a rank are looked up in the download.
+        chunksize (int): The number of occurrences read at once.
+
+    Returns:
+        tuple: (first_records, api_usageKeys):
+            first_records (pd.DataFrame): The "species", "country" and "years" of each first record.
+            api_usageKeys (list): The usageKeys that could not be looked up in the download.
+    """
+    ranks = ranks or {}
+    first_years = None
+    rows = 0
+
+    with zipfile.ZipFile(zip_path) as z:
+        names = z.namelist()
+        # Darwin Core Archive occurrences, or the SIMPLE_CSV table
+        if "occurrence.txt" in names:
+            table_name = "occurrence.txt"
+        else:
+            table_name = [name for name in names if name.endswith(".csv")][0]
+        with z.open(table_name) as f:
+            header = f.readline().decode("utf-8").rstrip("\r\n").split("\t")
+
+        key_columns = [
+            col
+            for col in GBIF_TAXON_KEY_COLUMNS + list(GBIF_RANK_KEY_COLUMNS.values())
+            if col in header
+        ]
+
+        # usageKeys that the download can't match to the occurrences of lower taxa
+        api_usageKeys = []
+        download_usageKeys = set()
+        for key in usageKeys:
+            rank = ranks.get(str(key))
+            if rank in GBIF_RANK_KEY_COLUMNS and GBIF_RANK_KEY_COLUMNS[rank] not in header:
+                api_usageKeys.append(key)
+            else:
+                download_usageKeys.add(str(key))
+
+        with z.open(table_name) as f:
+            chunks = pd.read_csv(
+                f,
+                sep="\t",
+                quoting=3,  # csv.QUOTE_NONE: the download is not quoted
+                usecols=key_columns + ["countryCode", "year", "occurrenceStatus"],
+                dtype={col: str for col in key_columns + ["countryCode"]},
+                keep_default_na=False,
+                na_values=[""],
+                chunksize=chunksize,
+            )
+            for chunk in chunks:
+                rows += len(chunk.index)
+                chunk["year"] = pd.to_numeric(chunk["year"], errors="coerce")
+                chunk = chunk.loc[
+                    (chunk["occurrenceStatus"] == "PRESENT")
+                    & chunk["countryCode"].notna()
+                    & (chunk["year"] >= base_year)
+                ]
+
+                # An occurrence counts for its taxon and for each taxon above it
+                matches = []
+                for col in key_columns:
+                    matches.append(
+                        chunk.loc[
+                            chunk[col].isin(download_usageKeys),
+                            [col, "countryCode", "year"],
+                        ].set_axis(["species", "country", "years"], axis=1)
+                    )
+                chunk_first = (
+                    pd.concat(matches).groupby(["species", "country"])["years"].min()
+                )
+
+                if first_years is None:
+                    first_years = chunk_first
+                else:
+                    first_years = pd.concat([first_years, chunk_first]).groupby(
+                        level=["species", "country"]
+                    ).min()
+                print(f"{rows} occurrences read, {len(first_years)} first records")
+
+    if first_years is None:
+        first_records = pd.DataFrame(columns=["species", "country", "years"])
+    else:
+        first_records = first_years.astype(int).reset_index()
+        first_records = first_records.sort_values(
+            ["species", "country"], ignore_index=True
+        )
+    return first_records, api_usageKeys
@@ -0,0 +1,154 @@
+"""
+File: data_update/http_client.py
+Author: GIATAR team
+Date created: 2026-10-17
+Description: Shared HTTP client for the data_update network calls: pooled keep-alive sessions per host, timeouts, and retries with exponential backoff and jitter
+"""
+
+import random
+import threading
+import warnings
+from time import sleep
+from urllib.parse import urlsplit
+
+import requests
+import urllib3
+
+# Seconds to wait for a connection and for a response
+TIMEOUT = (10, 60)
+
+# Times a request is sent again after a connection error, a timeout or a RETRY_STATUS response
+RETRIES = 4
+
+# Seconds before the first retry, doubled for each retry up to MAX_BACKOFF
+BACKOFF = 5
+MAX_BACKOFF = 300
+
+# Responses that are worth retrying: rate limited or server errors
+RETRY_STATUS = [429, 500, 502, 503, 504]
+
+# Connections kept open per host (at least the number of concurrent requests)
+POOL_SIZE = 16
+
+_sessions = {}
+_lock = threading.Lock()
+
+
+def configure(timeout=None, retries=None, backoff=None, pool_size=None):
+    """
+    Change the client settings. Sessions are opened again with the new settings.
+    """
+    global TIMEOUT, RETRIES, BACKOFF, POOL_SIZE
+    with _lock:
+        if timeout is not None:
+            TIMEOUT = timeout
+        if retries is not None:
+            RETRIES = retries
+        if backoff is not None:
+            BACKOFF = backoff
+        if pool_size is not None and pool_size != POOL_SIZE:
+            POOL_SIZE = pool_size
+            for session in _sessions.values():
+                session.close()
+            _sessions.clear()
+
+
+def get_session(url):
+    """
+    Return the session of the host of a URL, which keeps connections to the host open.
+    """
+    host = urlsplit(url).netloc
+    with _lock:
+        if host not in _sessions:
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(
+                pool_connections=1, pool_maxsize=POOL_SIZE
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _sessions[host] = session
+        return _sessions[host]
+
+
+def backoff_delay(attempt, retry_after=None):
+    """
+    Seconds to wait before a retry: a random time up to BACKOFF * 2^attempt ("full
+    jitter", so that concurrent requests don't retry at the same moment), or the
+    server's Retry-After time if it is longer.
+    """
+    delay = random.uniform(0, min(MAX_BACKOFF, BACKOFF * 2**attempt))
+    if retry_after is not None and retry_after.isdigit():
+        delay = max(delay, float(retry_after))
+    return delay
+
+
+def get(url, retries=None, timeout=None, rate_limit=None, **kwargs):
+    """
+    Send a GET request with the pooled session of the URL's host, retrying connection
+    errors, timeouts and RETRY_STATUS responses with exponential backoff.
+
+    Args:
+        url (str): The URL.
+        retries (int, optional): Times to retry. Defaults to RETRIES.
+        timeout (float or tuple, optional): Connection and read timeouts. Defaults to TIMEOUT.
+        rate_limit (optional): A rate limit shared with other requests (an object with an
+            acquire() method that waits for a token), taken before every attempt, retries included.
+        **kwargs: Other arguments of requests.get (e.g. params, verify).
+
+    Returns:
+        requests.Response: The response (which may have an error status other than RETRY_STATUS).
+
+    Raises:
+        requests.exceptions.RequestException: If the last attempt fails.
+    """
+    retries = RETRIES if retries is None else retries
+    timeout = TIMEOUT if timeout is None else timeout
+
+    for attempt in range(retries + 1):
+        retry_after = None
+        if rate_limit is not None:
+            rate_limit.acquire()
+        try:
+            response = get_session(url).get(url, timeout=timeout, **kwargs)
+            if response.status_code not in RETRY_STATUS:
+                return response
+            retry_after = response.headers.get("Retry-After")
+            error = requests.exceptions.HTTPError(
+                f"{response.status_code} response from {url}", response=response
+            )
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            error = e
+        if attempt == retries:
+            raise error
+
+        delay = backoff_delay(attempt, retry_after)
+        print(f"Retrying in {delay:.0f} seconds: {error}")
+        sleep(delay)
+
+
+def get_json(url, **kwargs):
+    """
+    Send a GET request (see get) and return the decoded JSON response.
+    """
+    return get(url, **kwargs).json()
+
+
+def get_page(url, **kwargs):
+    """
+    Send a GET request (see get) for a web page, without certificate checks.
+
+    Returns:
+        bytes: The page, or None if it does not exist (404).
+
+    Raises:
+        requests.exceptions.RequestException: If the request fails or has another error status.
+    """
+    kwargs.setdefault("verify", False)
+    with warnings.catch_warnings():
+        # The EPPO and CABI pages are read without certificate checks: don't warn on every page
+        warnings.simplefilter("ignore", urllib3.exceptions.InsecureRequestWarning)
+        response = get(url, **kwargs)
+    if response.status_code == 404:
+        return None
+    response.raise_for_status()
+    return response.content
@@ -0,0 +1,526 @@
+"""
+File: query_functions/python/GIATAR_cli.py
+Author: GIATAR team
+Date created: 2026-10-17
+Description: Command-line tools for the GIATAR query functions. Run from the repository root, e.g.
+    python -m query_functions.python.GIATAR_cli warm-gbif-cache names.txt
+    python -m query_functions.python.GIATAR_cli serve --port 8765
+    python -m query_functions.python.GIATAR_cli load-test http://127.0.0.1:8765 names.txt
+    python -m query_functions.python.GIATAR_cli batch names.txt first_introductions out.parquet
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import requests
+
+from query_functions.python import GIATAR_query_functions as gqf
+
+
+def read_names(file_path):
+    """
+    Read a file of species names or usageKeys, one per line, skipping blank lines.
+    """
+    with open(file_path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def warm_gbif_cache(args):
+    names = read_names(args.names)
+    counts = gqf.warm_gbif_cache(names, workers=args.workers, ttl_days=args.ttl_days)
+    print(
+        f"GBIF name cache: {counts['cached']} already cached, {counts['matched']} matched,"
+        f" {counts['unmatched']} unmatched, {counts['failed']} failed"
+    )
+
+
+def query_value(query, name, default=None):
+    """
+    Return the first value of a query string parameter, or default if it is missing.
+    """
+    values = query.get(name)
+    return values[0] if values else default
+
+
+def query_flag(query, name, default):
+    """
+    Return a true/false query string parameter ("true", "1" or "yes" for True).
+    """
+    value = query_value(query, name)
+    if value is None:
+        return default
+    return value.lower() in ["true", "1", "yes"]
+
+
+def query_species(query):
+    species = query_value(query, "species")
+    if species is None:
+        raise ValueError("Missing query parameter: species")
+    return species
+
+
+def query_list(query, name):
+    """
+    Return a list query string parameter, given as repeated or comma-separated values.
+    """
+    values = [v for value in query.get(name, []) for v in value.split(",") if v]
+    return values or None
+
+
+# Path: function answering the request from the parsed query string
+ENDPOINTS = {
+    "/usageKey": lambda q: gqf.get_usageKey(
+        query_species(q), normalize=query_flag(q, "normalize", False)
+    ),
+    "/first_introductions": lambda q: gqf.get_first_introductions(
+        query_species(q), ISO3_only=query_flag(q, "ISO3_only", False)
+    ),
+    "/all_introductions": lambda q: gqf.get_all_introductions(
+        query_species(q),
+        ISO3_only=query_flag(q, "ISO3_only", True),
+        import_additional_native_info=query_flag(q, "native_info", True),
+    ),
+    "/native_ranges": lambda q: gqf.get_native_ranges(
+        query_species(q), ISO3=query_list(q, "ISO3")
+    ),
+    "/ecology": lambda q: gqf.get_ecology(query_species(q)),
+    "/hosts_and_vectors": lambda q: gqf.get_hosts_and_vectors(query_species(q)),
+    "/common_names": lambda q: gqf.get_common_names(query_species(q)),
+    "/species_by_common_name": lambda q: gqf.get_usageKeys_by_common_name(
+        query_value(q, "name", "")
+    ),
+    "/species_list": lambda q: gqf.get_species_list(
+        kingdom=query_value(q, "kingdom"),
+        phylum=query_value(q, "phylum"),
+        taxonomic_class=query_value(q, "class"),
+        order=query_value(q, "order"),
+        family=query_value(q, "family"),
+        genus=query_value(q, "genus"),
+    ),
+}
+
+
+def to_json(result):
+    """
+    Convert a query result (DataFrames, dictionaries of DataFrames, lists or values)
+    to JSON-compatible values, with DataFrames as lists of row records.
+    """
+    if isinstance(result, pd.DataFrame):
+        return json.loads(result.to_json(orient="records", date_format="iso"))
+    if isinstance(result, dict):
+        return {str(key): to_json(value) for key, value in result.items()}
+    if isinstance(result, (list, tuple)):
+        return [to_json(value) for value in result]
+    if isinstance(result, np.generic):
+        return result.item()
+    if result is not None and pd.isna(result):
+        return None
+    return result
+
+
+class ResponseCache:
+    """
+    A thread-safe cache of the most recently used responses.
+
+    Args:
+        size (int): The number of responses to keep (0 to disable the cache).
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self._responses = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._responses:
+                return None
+            self._responses.move_to_end(key)
+            return self._responses[key]
+
+    def put(self, key, response):
+        if self.size <= 0:
+            return
+        with self._lock:
+            self._responses[key] = response
+            self._responses.move_to_end(key)
+            while len(self._responses) > self.size:
+                self._responses.popitem(last=False)
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+    # Keep connections open between requests, and send small responses without waiting
+    # for the client to acknowledge the headers (Nagle's algorithm)
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    cache = ResponseCache(0)
+    quiet = False
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        # The same query in any parameter order is the same response
+        key = (url.path, tuple(sorted((k, tuple(v)) for k, v in query.items())))
+
+        response = self.cache.get(key)
+        if response is None:
+            response = self.answer(url.path, query)
+            if response[0] == 200:
+                self.cache.put(key, response)
+
+        status, body = response
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def answer(self, path, query):
+        """
+        Run the query function of an endpoint and return (HTTP status, JSON body).
+        """
+        if path == "/":
+            status, result = 200, {"endpoints": sorted(ENDPOINTS)}
+        elif path not in ENDPOINTS:
+            status, result = 404, {"error": f"Unknown endpoint: {path}"}
+        else:
+            try:
+                status, result = 200, to_json(ENDPOINTS[path](query))
+            except ValueError as e:
+                status, result = 400, {"error": str(e)}
+            except Exception as e:
+                status, result = 500, {"error": f"{type(e).__name__}: {e}"}
+        return status, json.dumps(result).encode("utf-8")
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+
+# Endpoints answered from pandas tables even with the SQLite backend
+PANDAS_ENDPOINTS = ["/species_list", "/species_by_common_name"]
+
+
+def warm_store():
+    """
+    Load the tables used by the server and build their indexes, so that the first
+    requests don't pay for loading the dataset. With the SQLite backend, only the
+    database connection is opened and no tables are loaded.
+    """
+    start = time.perf_counter()
+    if gqf.store.backend == "sqlite":
+        species = (
+            gqf.store.sql()
+            .execute("SELECT usageKey FROM invasive_all_source LIMIT 1")
+            .fetchone()[0]
+        )
+        endpoints = {
+            path: endpoint
+            for path, endpoint in ENDPOINTS.items()
+            if path not in PANDAS_ENDPOINTS
+        }
+    else:
+        for table_name, (file_path, _) in gqf.TABLES.items():
+            if os.path.exists(os.path.join(gqf.store.data_path, file_path)):
+                gqf.store.get(table_name)
+        species = gqf.store.get("invasive_all_source")["usageKey"].iloc[0]
+        endpoints = ENDPOINTS
+
+    # One query per endpoint builds the derived indexes
+    errors = []
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for path, endpoint in endpoints.items():
+            try:
+                endpoint({"species": [species], "name": ["a"]})
+            except Exception as e:
+                errors.append(f"Could not warm {path}: {type(e).__name__}: {e}")
+    for error in errors:
+        print(error)
+    print(f"Store warmed in {time.perf_counter() - start:.1f} s")
+
+
+def serve(args):
+    QueryHandler.cache = ResponseCache(args.cache_size)
+    QueryHandler.quiet = args.quiet
+    warm_store()
+    server = ThreadingHTTPServer((args.host, args.port), QueryHandler)
+    print(f"Serving GIATAR queries on http://{args.host}:{args.port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def load_test(args):
+    names = read_names(args.names)
+    endpoints = args.endpoints.split(",")
+    urls = [
+        f"{args.url.rstrip('/')}/{endpoints[i % len(endpoints)]}"
+        for i in range(args.requests)
+    ]
+    params = [{"species": names[i % len(names)]} for i in range(args.requests)]
+    sessions = threading.local()
+
+    def timed_get(i):
+        if not hasattr(sessions, "session"):
+            sessions.session = requests.Session()
+        start = time.perf_counter()
+        try:
+            ok = sessions.session.get(urls[i], params=params[i], timeout=60).ok
+        except requests.RequestException:
+            ok = False
+        return time.perf_counter() - start, ok
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        results = list(executor.map(timed_get, range(args.requests)))
+    elapsed = time.perf_counter() - start
+
+    latencies = np.array([latency for latency, _ in results]) * 1000
+    errors = sum(not ok for _, ok in results)
+    print(
+        f"{args.requests} requests in {elapsed:.2f} s ({args.requests / elapsed:.1f} requests/s),"
+        f" {errors} errors"
+    )
+    print(
+        f"Latency (ms): p50 {np.percentile(latencies, 50):.1f},"
+        f" p90 {np.percentile(latencies, 90):.1f},"
+        f" p99 {np.percentile(latencies, 99):.1f}, max {latencies.max():.1f}"
+    )
+
+
+# Query name: function returning the rows for one species name or usageKey
+BATCH_QUERIES = {
+    "first_introductions": lambda name, options: gqf.get_first_introductions(
+        name, **options
+    ),
+    "all_introductions": lambda name, options: gqf.get_all_introductions(
+        name, **options
+    ),
+}
+for table_name in gqf.TRAIT_TABLES:
+    BATCH_QUERIES[table_name] = lambda name, options, table_name=table_name: (
+        gqf.get_trait_table(table_name, gqf.get_usageKey(name))
+    )
+
+
+class BatchWriter:
+    """
+    Append DataFrames to one CSV or Parquet file (chosen by the file extension).
+
+    The columns and types of the file are set by the first DataFrame written.
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.parquet = file_path.lower().endswith(".parquet")
+        if not self.parquet and not file_path.lower().endswith(".csv"):
+            raise ValueError("The output file must be a .csv or .parquet file")
+        self.columns = None
+        self.rows = 0
+        self._parquet_writer = None
+
+    def write(self, df):
+        if self.columns is None:
+            self.columns = list(df.columns)
+        df = df.reindex(columns=self.columns)
+        # Categories differ between chunks: write the values
+        for col in df.select_dtypes(include="category").columns:
+            df[col] = df[col].astype(object)
+
+        if not self.parquet:
+            df.to_csv(
+                self.file_path,
+                mode="w" if self.rows == 0 else "a",
+                header=self.rows == 0,
+                index=False,
+            )
+            self.rows += len(df.index)
+            return
+
+        if self._parquet_writer is None:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            # Columns that are empty in the first chunk hold strings in later chunks
+            schema = pa.schema(
+                [
+                    field.with_type(pa.string()) if pa.types.is_null(field.type) else field
+                    for field in table.schema
+                ]
+            ).remove_metadata()
+            self._parquet_writer = pq.ParquetWriter(self.file_path, schema)
+        table = pa.Table.from_pandas(
+            df, schema=self._parquet_writer.schema, preserve_index=False
+        )
+        self._parquet_writer.write_table(table)
+        self.rows += len(df.index)
+
+    def close(self):
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+
+
+def batch(args):
+    names = read_names(args.names)
+    query = BATCH_QUERIES[args.query]
+    # Leave the query functions' own default unless the option is given
+    options = {} if args.ISO3_only is None else {"ISO3_only": args.ISO3_only}
+
+    def run(name):
+        try:
+            df = query(name, options)
+        except Exception as e:
+            return name, None, f"{type(e).__name__}: {e}"
+        if df is None or len(df.index) == 0:
+            return name, None, None
+        df = df.reset_index(drop=True)
+        df.insert(0, "query", name)
+        return name, df, None
+
+    writer = BatchWriter(args.output)
+    not_found = []
+    failed = []
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        for start in range(0, len(names), args.chunk_size):
+            chunk = names[start : start + args.chunk_size]
+            # Silence the per-species messages of the query functions
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                results = list(executor.map(run, chunk))
+
+            frames = [df for _, df, _ in results if df is not None]
+            if len(frames) > 0:
+                writer.write(pd.concat(frames, ignore_index=True))
+            not_found += [name for name, df, error in results if df is None and error is None]
+            failed += [(name, error) for name, _, error in results if error is not None]
+            print(
+                f"Processed {start + len(chunk)}/{len(names)} names, {writer.rows} rows written"
+            )
+    writer.close()
+
+    print(
+        f"Done: {writer.rows} rows for {len(names) - len(not_found) - len(failed)} names"
+        f" written to {args.output}, {len(not_found)} names without rows, {len(failed)} failed"
+    )
+    for name, error in failed:
+        print(f"Failed: {name}: {error}")
+    if writer.rows == 0:
+        print("No rows were found, so no output file was written")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="GIATAR_cli", description="Command-line tools for the GIATAR dataset"
+    )
+    parser.add_argument(
+        "--data-path",
+        help="Path to the GIATAR data folder (defaults to DATA_PATH in .env)",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=["pandas", "sqlite"],
+        default="pandas",
+        help="Answer queries from tables loaded in memory or from the SQLite database",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    warm = commands.add_parser(
+        "warm-gbif-cache",
+        help="Look up names that are not in GIATAR in the GBIF backbone and cache the matches",
+    )
+    warm.add_argument("names", help="File of species names, one per line")
+    warm.add_argument(
+        "--workers", type=int, default=8, help="Number of concurrent GBIF requests"
+    )
+    warm.add_argument(
+        "--ttl-days",
+        type=float,
+        default=gqf.GBIF_CACHE_TTL_DAYS,
+        help="Days before a cached match is looked up again",
+    )
+    warm.set_defaults(run=warm_gbif_cache)
+
+    server = commands.add_parser(
+        "serve", help="Serve the query functions as a JSON HTTP API"
+    )
+    server.add_argument("--host", default="127.0.0.1", help="Address to listen on")
+    server.add_argument("--port", type=int, default=8765, help="Port to listen on")
+    server.add_argument(
+        "--cache-size",
+        type=int,
+        default=1024,
+        help="Number of responses to cache (0 to disable)",
+    )
+    server.add_argument(
+        "--quiet", action="store_true", help="Don't log every request"
+    )
+    server.set_defaults(run=serve)
+
+    load = commands.add_parser(
+        "load-test", help="Send concurrent requests to a server and report latencies"
+    )
+    load.add_argument("url", help="URL of the server, e.g. http://127.0.0.1:8765")
+    load.add_argument("names", help="File of species names or usageKeys, one per line")
+    load.add_argument(
+        "--endpoints",
+        default="first_introductions,native_ranges,ecology,hosts_and_vectors,common_names",
+        help="Comma-separated endpoints to call in turn",
+    )
+    load.add_argument(
+        "--requests", type=int, default=1000, help="Number of requests to send"
+    )
+    load.add_argument(
+        "--concurrency", type=int, default=8, help="Number of concurrent requests"
+    )
+    load.set_defaults(run=load_test)
+
+    batcher = commands.add_parser(
+        "batch",
+        help="Run a query for a file of species and stream the results to a CSV or Parquet file",
+    )
+    batcher.add_argument("names", help="File of species names or usageKeys, one per line")
+    batcher.add_argument(
+        "query",
+        choices=sorted(BATCH_QUERIES),
+        help="Introductions or a trait table to look up for each species",
+    )
+    batcher.add_argument("output", help="Output file, ending in .csv or .parquet")
+    batcher.add_argument(
+        "--ISO3-only",
+        dest="ISO3_only",
+        action=argparse.BooleanOptionalAction,
+        help="Only keep introductions with 3-character ISO3 codes (by default as in"
+        " get_first_introductions / get_all_introductions)",
+    )
+    batcher.add_argument(
+        "--chunk-size",
+        type=int,
+        default=500,
+        help="Number of species whose results are held in memory before writing",
+    )
+    batcher.add_argument(
+        "--workers", type=int, default=4, help="Number of species queried at once"
+    )
+    batcher.set_defaults(run=batch)
+
+    args = parser.parse_args(argv)
+    if args.data_path is not None:
+        gqf.store.set_data_path(args.data_path)
+    gqf.store.backend = args.backend
+    args.run(args)
+
+
+if __name__ == "__main__":
+    main()
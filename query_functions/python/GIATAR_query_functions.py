@@ -12,13 +12,23 @@ import pygbif
 import dotenv
 import requests
 import zipfile
-import io
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from pathlib import Path
+from datetime import date
 
 
 #### DATA PATH ####
 def create_dotenv(dp):
     """
     Creates a .env file in the current directory and writes the provided data path to it.
+    The shared store is pointed at the new data path.
 
     Args:
         dp (str): The data path to be written to the .env file.
@@ -30,31 +40,622 @@ def create_dotenv(dp):
     # write DATA_PATH to .env file
     with open(".env", "w") as f:
         f.write(f"DATA_PATH={dp}")
+    store.set_data_path(dp)
 
 
-# if .env file exists, get DATA_PATH from .env file
-if os.path.exists(".env"):
-    data_path = dotenv.get_key(".env", "DATA_PATH")
-    os.chdir(data_path)
-else:
-    print("No .env file found. Please use `create_dotenv()` to create a .env file")
-    # prompt user for data path
-    dp = input("Please enter the path to the data folder: ")
-    create_dotenv(dp)
+def find_data_path():
+    """
+    Find the GIATAR data folder from the .env file in the current directory, or from
+    the DATA_PATH environment variable.
 
+    Returns:
+        str: The path to the GIATAR data folder.
 
-if "invasive_all_source" not in globals():
-    global invasive_all_source
-    invasive_all_source = pd.read_csv(
-        r"species lists\invasive_all_source.csv", dtype={"usageKey": "str"}
-    )
+    Raises:
+        FileNotFoundError: If no data path is configured.
+    """
+    data_path = None
+    if os.path.exists(".env"):
+        data_path = dotenv.get_key(".env", "DATA_PATH")
+    if not data_path:
+        data_path = os.getenv("DATA_PATH")
+    if not data_path:
+        raise FileNotFoundError(
+            "No data path found. Please use `create_dotenv()` to create a .env file"
+            " or `store.set_data_path()` to set the path to the data folder"
+        )
+    return data_path
+
+
+#### DATA TABLES ####
+
+# Table name: (path relative to the data folder, pd.read_csv arguments)
+# "usecols" limits the columns loaded from both the CSV and the Parquet snapshot
+# Tables with a ".parquet" path are written as Parquet by the data update scripts
+TABLES = {
+    "invasive_all_source": (
+        "species lists/invasive_all_source.csv",
+        {"dtype": {"usageKey": str}},
+    ),
+    "first_records": (
+        "occurrences/first_records.csv",
+        {"dtype": {"usageKey": str}, "low_memory": False},
+    ),
+    "all_records": (
+        "occurrences/all_records.csv",
+        {"dtype": {"usageKey": str}, "low_memory": False},
+    ),
+    "native_ranges": (
+        "native ranges/all_sources_native_ranges.csv",
+        {"dtype": {"usageKey": str}, "low_memory": False},
+    ),
+    "native_status": ("occurrences/native_status.parquet", {}),
+    "native_range_crosswalk": (
+        "native ranges/native_range_crosswalk.csv",
+        {"usecols": ["ISO3", "modified_Bioregion"], "low_memory": False},
+    ),
+    "GBIF_backbone_invasive": (
+        "GBIF data/GBIF_backbone_invasive.csv",
+        {
+            "usecols": [
+                "usageKey",
+                "kingdom",
+                "phylum",
+                "class",
+                "order",
+                "family",
+                "genus",
+            ]
+        },
+    ),
+    "CABI_rainfall": (
+        "CABI data/CABI_tables/torainfall.csv",
+        {"dtype": {"usageKey": str}},
+    ),
+    "CABI_airtemp": (
+        "CABI data/CABI_tables/toairTemperature.csv",
+        {"dtype": {"usageKey": str}},
+    ),
+    "CABI_climate": (
+        "CABI data/CABI_tables/toclimate.csv",
+        {"dtype": {"usageKey": str}},
+    ),
+    "CABI_environments": (
+        "CABI data/CABI_tables/toenvironments.csv",
+        {"dtype": {"usageKey": str}},
+    ),
+    "CABI_latitude_altitude": (
+        "CABI data/CABI_tables/tolatitudeAndAltitudeRanges.csv",
+        {"dtype": {"usageKey": str}},
+    ),
+    "CABI_natural_enemies": (
+        "CABI data/CABI_tables/tonaturalEnemies.csv",
+        {"dtype": {"usageKey": str}},
+    ),
+    "CABI_water_tolerances": (
+        "CABI data/CABI_tables/towaterTolerances.csv",
+        {"dtype": {"usageKey": str}},
+    ),
+    "CABI_wood_packaging": (
+        "CABI data/CABI_tables/towoodPackaging.csv",
+        {"dtype": {"usageKey": str}},
+    ),
+    "CABI_plant_trade": (
+        "CABI data/CABI_tables/toplantTrade.csv",
+        {"dtype": {"usageKey": str}},
+    ),
+    "CABI_host_plants": (
+        "CABI data/CABI_tables/tohostPlants.csv",
+        {"dtype": {"usageKey": str}},
+    ),
+    "CABI_pathway_vectors": (
+        "CABI data/CABI_tables/topathwayVectors.csv",
+        {"dtype": {"usageKey": str}},
+    ),
+    "CABI_pathway_causes": (
+        "CABI data/CABI_tables/topathwayCauses.csv",
+        {"dtype": {"usageKey": str}},
+    ),
+    "CABI_vectorsAndIntermediateHosts": (
+        "CABI data/CABI_tables/tovectorsAndIntermediateHosts.csv",
+        {"dtype": {"usageKey": str}},
+    ),
+    "CABI_impact_summary": (
+        "CABI data/CABI_tables/toimpactSummary.csv",
+        {"dtype": {"usageKey": str}},
+    ),
+    "CABI_latitude_altitude_ranges": (
+        "CABI data/CABI_tables/tolatitudeAltitudeRanges.csv",
+        {"dtype": {"usageKey": str}},
+    ),
+    "CABI_symptoms_signs": (
+        "CABI data/CABI_tables/tosymptomsSigns.csv",
+        {"dtype": {"usageKey": str}},
+    ),
+    "CABI_threatened_species": (
+        "CABI data/CABI_tables/tothreatenedSpecies.csv",
+        {"dtype": {"usageKey": str}},
+    ),
+    "DAISIE_habitats": ("DAISIE data/DAISIE_habitat.csv", {"dtype": {"usageKey": str}}),
+    "DAISIE_pathways": (
+        "DAISIE data/DAISIE_pathways.csv",
+        {"dtype": {"usageKey": str}},
+    ),
+    "DAISIE_vectors": ("DAISIE data/DAISIE_vectors.csv", {"dtype": {"usageKey": str}}),
+    "DAISIE_vernacular": (
+        "DAISIE data/DAISIE_vernacular_names.csv",
+        {"dtype": {"usageKey": str}, "low_memory": False},
+    ),
+    "EPPO_hosts": ("EPPO data/EPPO_hosts.csv", {"dtype": {"usageKey": str}}),
+    "EPPO_names": (
+        "EPPO data/EPPO_names.csv",
+        {"dtype": {"usageKey": str}, "low_memory": False},
+    ),
+}
+
+# Compact dtypes of the columns of the occurrence records tables (see apply_schema())
+RECORD_SCHEMA = {
+    "usageKey": "category",
+    "ISO3": "category",
+    "Source": "category",
+    "Type": "category",
+    "year": "Int16",
+    "Native": "boolean",
+}
+
+# Table name: schema applied to the table after it is read
+TABLE_SCHEMAS = {
+    "first_records": RECORD_SCHEMA,
+    "all_records": RECORD_SCHEMA,
+    "native_status": {"Native": "boolean"},
+}
+
+
+def apply_schema(table, schema=RECORD_SCHEMA, report=False, name="table"):
+    """
+    Convert the columns of a table to the compact dtypes of a schema: repeated strings
+    (usageKey, ISO3, Source, Type) to categoricals, years to nullable 16-bit integers and
+    Native to nullable booleans. Columns that are not in the table are skipped, and years
+    that are not whole numbers are kept as floats.
 
+    Args:
+        table (pandas.DataFrame): The table to convert.
+        schema (dict, optional): Column: dtype. Defaults to RECORD_SCHEMA.
+        report (bool, optional): If True, print the memory used before and after. Defaults to False.
+        name (str, optional): The name of the table in the report.
 
-if "first_records" not in globals():
-    global first_records
-    first_records = pd.read_csv(
-        r"occurrences\first_records.csv", dtype={"usageKey": "str"}, low_memory=False
-    )
+    Returns:
+        pandas.DataFrame: The converted table.
+    """
+    if report:
+        before = table.memory_usage(deep=True).sum()
+    table = table.copy()
+    for col, dtype in schema.items():
+        if col not in table.columns:
+            continue
+        try:
+            table[col] = table[col].astype(dtype)
+        except (TypeError, ValueError) as e:
+            print(f"Keeping {name} column {col} as {table[col].dtype}: {e}")
+    if report:
+        after = table.memory_usage(deep=True).sum()
+        print(
+            f"{name}: {before / 1e6:.1f} MB -> {after / 1e6:.1f} MB"
+            f" ({(before - after) / 1e6:.1f} MB saved)"
+        )
+    return table
+
+
+# Tables returned by get_trait_table (all are keys of TABLES)
+TRAIT_TABLES = [
+    "CABI_rainfall",
+    "CABI_airtemp",
+    "CABI_climate",
+    "CABI_environments",
+    "CABI_latitude_altitude",
+    "CABI_natural_enemies",
+    "CABI_water_tolerances",
+    "CABI_wood_packaging",
+    "CABI_host_plants",
+    "CABI_pathway_vectors",
+    "CABI_vectorsAndIntermediateHosts",
+    "DAISIE_habitats",
+    "CABI_impact_summary",
+    "CABI_latitude_altitude_ranges",
+    "CABI_symptoms_signs",
+    "CABI_threatened_species",
+    "EPPO_hosts",
+    "EPPO_names",
+    "DAISIE_pathways",
+    "DAISIE_vectors",
+    "DAISIE_vernacular",
+]
+
+# Row positions returned for a usageKey that is not in a table
+NO_ROWS = np.array([], dtype=np.intp)
+
+# Folder (inside the data folder) holding the Parquet snapshot written by write_parquet_snapshot()
+SNAPSHOT_DIR = "parquet"
+
+# Folder (inside the data folder) holding the text indexes used by get_taxa_by_host/pathway/vector
+TEXT_INDEX_DIR = "text_index"
+
+# File (inside the data folder) holding the SQLite database written by write_sqlite_database()
+SQLITE_FILE = "giatar.sqlite"
+
+# Keys sent to SQLite in one query (SQLite limits the number of query parameters)
+SQL_BATCH = 400
+
+
+def sql_regexp(pattern, text):
+    # REGEXP operator of the SQLite database: case-insensitive search, like str.contains(case=False)
+    return text is not None and re.search(pattern, text, re.IGNORECASE) is not None
+
+
+def nan_for_none(table):
+    """
+    Replace None with NaN in the object columns of a table, to match the CSV reader.
+    """
+    for col in table.select_dtypes(include="object").columns:
+        table[col] = table[col].where(table[col].notna(), np.nan)
+    return table
+
+
+class GIATARStore:
+    """
+    Lazily loads GIATAR tables from the data folder and keeps them in memory.
+
+    Each table in TABLES is read from disk the first time it is requested, and the
+    same DataFrame is returned on every later request. If the data folder has a
+    Parquet snapshot (see `write_parquet_snapshot()`), tables are read from it
+    instead of the CSV files. One shared store (`store`)
+    is used by all of the query functions in this module.
+
+    Args:
+        data_path (str, optional): The path to the GIATAR data folder. If None, the
+            path is found with `find_data_path()` when the first table is loaded.
+        memory_map (bool, optional): If True, files are memory-mapped while they are
+            read instead of being read into a buffer, which can make reading large
+            tables faster on local disks. Tables are still loaded into memory in full,
+            so this does not reduce memory use. Can also be set later with
+            `store.memory_map = True`. Defaults to False.
+        backend (str, optional): "pandas" to load tables into memory, or "sqlite" to
+            answer row lookups with indexed queries on the SQLite database written by
+            `write_sqlite_database()`, without loading the tables. Can also be set later
+            with `store.backend = "sqlite"`. Defaults to "pandas".
+    """
+
+    def __init__(self, data_path=None, memory_map=False, backend="pandas"):
+        self._data_path = data_path
+        self.memory_map = memory_map
+        self.backend = backend
+        self._sql = threading.local()
+        self._tables = {}
+        self._derived = {}
+        self._manifest = None
+        # One lock per table or derived structure, so that concurrent first uses
+        # (e.g. requests to the HTTP server) load or build it once
+        self._locks = {}
+        self._locks_lock = threading.Lock()
+
+    @property
+    def data_path(self):
+        if self._data_path is None:
+            self._data_path = find_data_path()
+        return self._data_path
+
+    def set_data_path(self, data_path):
+        """
+        Point the store at a new data folder and drop all loaded tables.
+        """
+        self._data_path = data_path
+        self.clear()
+
+    def lock(self, key):
+        """
+        Return the lock held while the table or derived structure `key` is loaded or built.
+        """
+        with self._locks_lock:
+            return self._locks.setdefault(key, threading.RLock())
+
+    def get(self, table_name):
+        """
+        Return a table, loading it from disk on first use. Threads that ask for a table
+        while it is loading wait for it instead of loading it again.
+
+        Args:
+            table_name (str): The name of the table (a key of TABLES).
+
+        Returns:
+            pandas.DataFrame: The full table.
+
+        Raises:
+            ValueError: If the table name is not found in TABLES.
+        """
+        table = self._tables.get(table_name)
+        if table is None:
+            with self.lock(table_name):
+                table = self._tables.get(table_name)
+                if table is None:
+                    table = self._tables[table_name] = self.load(table_name)
+        return table
+
+    def derived(self, table_name, name, build):
+        """
+        Return a structure derived from a table (e.g. an index), building it on first use.
+        Derived structures are dropped whenever their table is cleared, so they are
+        rebuilt from the reloaded table.
+
+        Args:
+            table_name (str): The name of the table the structure is built from.
+            name (str): The name of the derived structure.
+            build (function): Function that takes the table and returns the structure.
+        """
+        key = (table_name, name)
+        if key not in self._derived:
+            with self.lock(key):
+                if key not in self._derived:
+                    self._derived[key] = build(self.get(table_name))
+        return self._derived[key]
+
+    def usageKey_index(self, table_name):
+        """
+        Return a dictionary of usageKey: positions of the rows of a table with that usageKey.
+        """
+        return self.derived(
+            table_name,
+            "usageKey_index",
+            lambda table: table.groupby("usageKey", sort=False, observed=True).indices,
+        )
+
+    def rows(self, table_name, usageKey):
+        """
+        Return the rows of a table for one usageKey, using the usageKey index.
+
+        Args:
+            table_name (str): The name of the table (a key of TABLES).
+            usageKey (str): The usageKey to select.
+
+        Returns:
+            pandas.DataFrame: The rows matching the usageKey (empty if there are none).
+        """
+        if self.backend == "sqlite":
+            return self.sql_rows(table_name, [usageKey])
+        positions = self.usageKey_index(table_name).get(usageKey, NO_ROWS)
+        return self.get(table_name).iloc[positions]
+
+    def positions(self, table_name, usageKeys):
+        """
+        Return the row positions of a table for a list of usageKeys, grouped by usageKey
+        in the order of the list.
+        """
+        index = self.usageKey_index(table_name)
+        return np.concatenate(
+            [NO_ROWS] + [index.get(usageKey, NO_ROWS) for usageKey in usageKeys]
+        )
+
+    def rows_many(self, table_name, usageKeys):
+        """
+        Return the rows of a table for a list of usageKeys, grouped by usageKey in the
+        order of the list.
+        """
+        if self.backend == "sqlite":
+            return self.sql_rows(table_name, usageKeys)
+        return self.get(table_name).iloc[self.positions(table_name, usageKeys)]
+
+    def sql(self):
+        """
+        Return a read-only connection to the SQLite database in the data folder. Each
+        thread gets its own connection.
+
+        Raises:
+            FileNotFoundError: If the database has not been written.
+        """
+        path = os.path.abspath(os.path.join(self.data_path, SQLITE_FILE))
+        if getattr(self._sql, "path", None) != path:
+            if not os.path.exists(path):
+                raise FileNotFoundError(
+                    f"No SQLite database at {path}. Please write it with `write_sqlite_database()`"
+                )
+            connection = sqlite3.connect(Path(path).as_uri() + "?mode=ro", uri=True)
+            connection.create_function("REGEXP", 2, sql_regexp, deterministic=True)
+            self._sql.connection = connection
+            self._sql.path = path
+        return self._sql.connection
+
+    def sql_rows(self, table_name, keys, key_column="usageKey", where=None):
+        """
+        Select the rows of a table in the SQLite database for a list of keys, grouped by
+        key in the order of the list, with the row labels of the loaded table.
+
+        Args:
+            table_name (str): The name of the table.
+            keys (list): The values of key_column to select.
+            key_column (str, optional): The indexed column to select on. Defaults to "usageKey".
+            where (str, optional): An extra SQL condition on the rows (of table "t").
+
+        Returns:
+            pandas.DataFrame: The selected rows.
+        """
+        keys = list(keys)
+        condition = f"AND ({where}) " if where else ""
+        frames = []
+        for start in range(0, len(keys), SQL_BATCH):
+            batch = keys[start : start + SQL_BATCH]
+            values = ", ".join(["(?, ?)"] * len(batch))
+            query = (
+                f"WITH keys(key, position) AS (VALUES {values}) "
+                f'SELECT t.rowid - 1 AS "index", t.* FROM "{table_name}" t '
+                f'JOIN keys ON t."{key_column}" = keys.key WHERE 1 {condition}'
+                "ORDER BY keys.position, t.rowid"
+            )
+            params = [v for i, key in enumerate(batch) for v in (key, i)]
+            frames.append(pd.read_sql_query(query, self.sql(), params=params))
+        if len(frames) == 0:
+            query = f'SELECT t.rowid - 1 AS "index", t.* FROM "{table_name}" t WHERE 0'
+            frames.append(pd.read_sql_query(query, self.sql()))
+
+        table = pd.concat(frames).set_index("index")
+        table.index.name = None
+        table = nan_for_none(table)
+        if table_name in TABLE_SCHEMAS:
+            table = apply_schema(table, TABLE_SCHEMAS[table_name], name=table_name)
+        return table
+
+    def load(self, table_name, columns=None):
+        """
+        Read a table from disk without caching it.
+
+        Args:
+            table_name (str): The name of the table (a key of TABLES).
+            columns (list, optional): The columns to read. Defaults to the "usecols" of
+                the table in TABLES, or all columns.
+
+        Returns:
+            pandas.DataFrame: The table.
+        """
+        if table_name not in TABLES:
+            raise ValueError(f"Table name '{table_name}' not found.")
+        file_path, read_args = TABLES[table_name]
+        if columns is None:
+            columns = read_args.get("usecols")
+
+        snapshot_path = None
+        if not file_path.endswith(".parquet"):
+            snapshot_path = self.snapshot_path(file_path)
+
+        if file_path.endswith(".parquet"):
+            table = pd.read_parquet(
+                os.path.join(self.data_path, file_path),
+                columns=columns,
+                memory_map=self.memory_map,
+            )
+        elif snapshot_path is not None:
+            table = pd.read_parquet(
+                snapshot_path,
+                columns=columns,
+                memory_map=self.memory_map,
+            )
+            # Match the CSV reader: missing values in object columns are NaN, not None
+            table = nan_for_none(table)
+        else:
+            read_args = dict(read_args)
+            if columns is not None:
+                read_args["usecols"] = columns
+            read_args["memory_map"] = self.memory_map
+            table = pd.read_csv(os.path.join(self.data_path, file_path), **read_args)
+
+        if table_name in TABLE_SCHEMAS:
+            table = apply_schema(table, TABLE_SCHEMAS[table_name], name=table_name)
+        return table
+
+    def memory_usage(self):
+        """
+        Return the memory used by each loaded table, in MB.
+        """
+        return pd.Series(
+            {
+                table_name: table.memory_usage(deep=True).sum() / 1e6
+                for table_name, table in list(self._tables.items())
+            },
+            name="MB",
+            dtype=float,
+        )
+
+    def snapshot_path(self, file_path):
+        """
+        Return the path to the Parquet copy of a CSV file, or None if there is no
+        snapshot of the file or the CSV has changed since the snapshot was written.
+
+        Args:
+            file_path (str): The path of the CSV file relative to the data folder.
+        """
+        if self._manifest is None:
+            manifest_path = os.path.join(self.data_path, SNAPSHOT_DIR, "manifest.json")
+            if os.path.exists(manifest_path):
+                with open(manifest_path) as f:
+                    self._manifest = json.load(f)
+            else:
+                self._manifest = {"files": {}}
+
+        entry = self._manifest["files"].get(file_path)
+        if entry is None:
+            return None
+        source = os.path.join(self.data_path, file_path)
+        if os.path.exists(source) and os.path.getmtime(source) > entry["source_mtime"]:
+            return None
+        return os.path.join(self.data_path, SNAPSHOT_DIR, entry["path"])
+
+    def text_index(self, table_name):
+        """
+        Return the text index of a table (see `build_text_index()`), reading or building
+        it on first use (see `load_text_index()`).
+
+        Args:
+            table_name (str): The name of the table (a key of TEXT_COLUMNS).
+        """
+        key = (table_name, "text_index")
+        if key not in self._derived:
+            with self.lock(key):
+                if key not in self._derived:
+                    self._derived[key] = self.load_text_index(table_name)
+        return self._derived[key]
+
+    def load_text_index(self, table_name):
+        """
+        Read the text index of a table from the text index folder of the data folder
+        (see `write_text_index()`) if it was saved after the table's file last changed,
+        and otherwise build it and save it there. If it can't be saved (e.g. in a
+        read-only data folder), the index is only kept in memory. The table itself is
+        only loaded when the index has to be built.
+
+        Args:
+            table_name (str): The name of the table (a key of TEXT_COLUMNS).
+        """
+        file_path = TABLES[table_name][0]
+        source = os.path.join(self.data_path, file_path)
+        source_mtime = os.path.getmtime(source) if os.path.exists(source) else None
+        index_path = os.path.join(self.data_path, TEXT_INDEX_DIR, table_name)
+
+        index = read_text_index(index_path, source_mtime)
+        if index is None:
+            index = build_text_index(self.get(table_name), TEXT_COLUMNS[table_name])
+            try:
+                os.makedirs(os.path.dirname(index_path), exist_ok=True)
+                write_text_index(index, index_path, source_mtime)
+            except OSError as e:
+                # e.g. a read-only data folder: keep the index in memory only
+                print(
+                    f"Could not save text index of {table_name}, keeping it in memory: {e}"
+                )
+        return index
+
+    def is_loaded(self, table_name):
+        return table_name in self._tables
+
+    def clear(self, table_name=None):
+        """
+        Drop one table (or all tables, if table_name is None) from memory so that it
+        is read again on next use.
+        """
+        if table_name is None:
+            self._tables.clear()
+            self._derived.clear()
+            self._manifest = None
+        else:
+            self._tables.pop(table_name, None)
+            for key in [key for key in self._derived if key[0] == table_name]:
+                del self._derived[key]
+
+
+store = GIATARStore()
+
+
+def __getattr__(name):
+    # Keep module-level access to the tables working (e.g. gqf.first_records)
+    if name in TABLES:
+        return store.get(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def get_species_name(usageKey):
@@ -74,13 +675,109 @@ def get_species_name(usageKey):
     if not isinstance(usageKey, str):
         usageKey = str(usageKey).replace(".0", "")
 
-    if usageKey in invasive_all_source["usageKey"].values:
-        return invasive_all_source.loc[
-            invasive_all_source["usageKey"] == usageKey, "canonicalName"
-        ].values[0]
+    species = store.rows("invasive_all_source", usageKey)
+    if not species.empty:
+        return species["canonicalName"].values[0]
+
+
+# Columns of invasive_all_source searched by get_usageKey, in order of priority
+NAME_COLUMNS = [
+    "canonicalName",
+    "taxonSINAS",
+    "taxonEPPO",
+    "taxonCABI",
+    "usageKey",
+    "speciesGBIF",
+    "taxonDAISIE",
+]
+
+
+def normalize_name(name):
+    """
+    Lower-case a species name and collapse its whitespace, for case- and
+    whitespace-insensitive matching (e.g. " Apis  Mellifera" -> "apis mellifera").
+    """
+    return " ".join(str(name).split()).lower()
+
+
+def build_name_index(invasive_all_source):
+    """
+    Build dictionaries of species name: usageKey from every name column of invasive_all_source.
+
+    Where a name appears more than once, the usageKey follows the order of NAME_COLUMNS
+    and then the order of the rows, as in the column-by-column search of get_usageKey.
+
+    Args:
+        invasive_all_source (pandas.DataFrame): The master species list.
+
+    Returns:
+        tuple: (exact, normalized) dictionaries, keyed by the names as written and by
+            `normalize_name()` of the names.
+    """
+    exact = {}
+    normalized = {}
+    usageKeys = invasive_all_source["usageKey"].tolist()
+    for col in NAME_COLUMNS:
+        if col not in invasive_all_source.columns:
+            continue
+        for name, usageKey in zip(invasive_all_source[col].tolist(), usageKeys):
+            if pd.isna(name):
+                continue
+            exact.setdefault(name, usageKey)
+            normalized.setdefault(normalize_name(name), usageKey)
+    return exact, normalized
+
+
+def lookup_species_name(species_name, normalize=False):
+    """
+    Look a species name up in the name index of invasive_all_source (or in the name
+    tables of the SQLite database, with the SQLite backend).
+
+    Returns:
+        str: The usageKey of the name, or None if it is not in the index.
+    """
+    if store.backend == "sqlite":
+        tables = [("species_names", species_name)]
+        if normalize:
+            tables.append(("species_names_normalized", normalize_name(species_name)))
+        for table, name in tables:
+            row = (
+                store.sql()
+                .execute(f"SELECT usageKey FROM {table} WHERE name = ?", (name,))
+                .fetchone()
+            )
+            if row is not None:
+                return row[0]
+        return None
+
+    exact, normalized = store.derived(
+        "invasive_all_source", "name_index", build_name_index
+    )
+    if species_name in exact:
+        return exact[species_name]
+    elif normalize and normalize_name(species_name) in normalized:
+        return normalized[normalize_name(species_name)]
+    return None
+
+
+def species_exists(usageKey):
+    """
+    Check if a usageKey is in invasive_all_source.
+    """
+    if store.backend == "sqlite":
+        row = (
+            store.sql()
+            .execute(
+                "SELECT 1 FROM invasive_all_source WHERE usageKey = ? LIMIT 1",
+                (usageKey,),
+            )
+            .fetchone()
+        )
+        return row is not None
+    return usageKey in store.usageKey_index("invasive_all_source")
 
 
-def get_usageKey(species_name):
+def get_usageKey(species_name, normalize=False):
     """
     Retrieve the usage key for a given species name from various sources.
     This function checks multiple columns in the `invasive_all_source` DataFrame
@@ -89,49 +786,25 @@ def get_usageKey(species_name):
     the GBIF database using the pygbif library.
     Parameters:
     species_name (str): The name of the species for which to retrieve the usage key.
+    normalize (bool, optional): If True, names that only differ in case or whitespace also match. Defaults to False.
     Returns:
     str: The usage key associated with the species name if found, otherwise None.
     Notes:
-    - The function first checks if the `invasive_all_source` DataFrame is loaded,
-      and if not, it loads the DataFrame from a CSV file.
+    - Names are looked up in a dictionary built once from `invasive_all_source` (see `build_name_index()`),
+      which is rebuilt when the table is reloaded.
     - The function checks the following columns in order: "canonicalName", "taxonSINAS",
       "taxonEPPO", "taxonCABI", "usageKey", "speciesGBIF", "taxonDAISIE".
     - If the species name is a digit or starts with "xx" or "XX", it is returned as is.
     - If the species name is not found in the DataFrame, the function attempts to
-      retrieve the usage key from the GBIF database using the pygbif library.
+      retrieve the usage key from the GBIF database using the pygbif library. GBIF matches
+      (and non-matches) are cached in the data folder (see `lookup_gbif_backbone()`).
     - If the species name is not found in both the DataFrame and the GBIF database,
       the function prints an error message and returns None.
     """
-    if "invasive_all_source" not in globals():
-        global invasive_all_source
-        invasive_all_source = pd.read_csv(f"species lists\invasive_all_source.csv")
-
-    if species_name in invasive_all_source["canonicalName"].values:
-        return invasive_all_source.loc[
-            invasive_all_source["canonicalName"] == species_name, "usageKey"
-        ].values[0]
-    elif species_name in invasive_all_source["taxonSINAS"].values:
-        return invasive_all_source.loc[
-            invasive_all_source["taxonSINAS"] == species_name, "usageKey"
-        ].values[0]
-    elif species_name in invasive_all_source["taxonEPPO"].values:
-        return invasive_all_source.loc[
-            invasive_all_source["taxonEPPO"] == species_name, "usageKey"
-        ].values[0]
-    elif species_name in invasive_all_source["taxonCABI"].values:
-        return invasive_all_source.loc[
-            invasive_all_source["taxonCABI"] == species_name, "usageKey"
-        ].values[0]
-    elif species_name in invasive_all_source["usageKey"].values:
-        return species_name
-    elif species_name in invasive_all_source["canonicalName"].values:
-        return invasive_all_source.loc[
-            invasive_all_source["speciesGBIF"] == species_name, "usageKey"
-        ].values[0]
-    elif species_name in invasive_all_source["taxonDAISIE"].values:
-        return invasive_all_source.loc[
-            invasive_all_source["taxonDAISIE"] == species_name, "usageKey"
-        ].values[0]
+    usageKey = lookup_species_name(species_name, normalize)
+
+    if usageKey is not None:
+        return usageKey
     # elif species name is digits or starts with "xx" or "XX" return species name
     elif (
         species_name.isdigit()
@@ -140,19 +813,230 @@ def get_usageKey(species_name):
     ):
         return species_name
     else:
-        try:
-            gbif = pygbif.species.name_backbone(name=species_name, rank="species")
-            return str(gbif["usageKey"])
-        except KeyError:
+        usageKey = lookup_gbif_backbone(species_name)
+        if usageKey is None:
             print("species not found in Database or GBIF")
-            return None
+        return usageKey
+
+
+#### GBIF NAME CACHE ####
+
+# File (inside the data folder) caching GBIF backbone matches of names not in invasive_all_source.
+# The GIATAR_GBIF_CACHE environment variable can give another path, e.g. when the data folder is read-only
+GBIF_CACHE_FILE = "gbif_name_cache.sqlite"
+
+# Days before a cached GBIF backbone match is looked up again
+GBIF_CACHE_TTL_DAYS = 30
+
+
+def gbif_cache_path():
+    """
+    Return the path of the GBIF name cache: the GIATAR_GBIF_CACHE environment variable,
+    or GBIF_CACHE_FILE in the data folder.
+    """
+    return os.getenv("GIATAR_GBIF_CACHE") or os.path.join(
+        store.data_path, GBIF_CACHE_FILE
+    )
+
+
+def open_gbif_cache():
+    """
+    Open the GBIF name cache (see `gbif_cache_path()`), creating it if needed.
+
+    Returns:
+        sqlite3.Connection: A connection to the cache, with a table "backbone" of
+            name, usageKey (NULL if GBIF has no match) and fetched (Unix time).
+
+    Raises:
+        sqlite3.OperationalError: If the cache can't be opened or created (e.g. in a
+            read-only data folder).
+    """
+    connection = sqlite3.connect(gbif_cache_path(), timeout=30)
+    connection.execute(
+        "CREATE TABLE IF NOT EXISTS backbone"
+        " (name TEXT PRIMARY KEY, usageKey TEXT, fetched REAL NOT NULL)"
+    )
+    return connection
+
+
+def read_gbif_cache(species_names, ttl_days=GBIF_CACHE_TTL_DAYS):
+    """
+    Read the cached GBIF backbone matches of a list of names that are not older than ttl_days.
+
+    Returns:
+        dict: name: usageKey (None for names that GBIF did not match), for the cached
+            names. Empty if the cache can't be opened, so that names are looked up in GBIF.
+    """
+    oldest = time.time() - ttl_days * 86400
+    cached = {}
+    try:
+        with closing(open_gbif_cache()) as connection:
+            for name in dict.fromkeys(species_names):
+                row = connection.execute(
+                    "SELECT usageKey FROM backbone WHERE name = ? AND fetched >= ?",
+                    (name, oldest),
+                ).fetchone()
+                if row is not None:
+                    cached[name] = row[0]
+    except sqlite3.OperationalError as e:
+        print(f"Could not read the GBIF name cache at {gbif_cache_path()}: {e}")
+    return cached
+
+
+def write_gbif_cache(matches):
+    """
+    Save GBIF backbone matches (a dictionary of name: usageKey or None) to the GBIF name
+    cache. The matches are not cached if the cache can't be written.
+    """
+    fetched = time.time()
+    try:
+        with closing(open_gbif_cache()) as connection, connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO backbone (name, usageKey, fetched) VALUES (?, ?, ?)",
+                [(name, usageKey, fetched) for name, usageKey in matches.items()],
+            )
+    except sqlite3.OperationalError as e:
+        print(f"Could not write the GBIF name cache at {gbif_cache_path()}: {e}")
+
+
+def fetch_gbif_backbone(species_name):
+    """
+    Match a species name to the GBIF backbone with the GBIF API.
+
+    Returns:
+        str: The usageKey of the match, or None if GBIF did not match the name.
+    """
+    gbif = pygbif.species.name_backbone(name=species_name, rank="species")
+    if "usageKey" not in gbif:
+        return None
+    return str(gbif["usageKey"])
+
+
+def lookup_gbif_backbone(species_name, ttl_days=GBIF_CACHE_TTL_DAYS):
+    """
+    Match a species name to the GBIF backbone, using the GBIF name cache.
+
+    Matches and non-matches are both cached in the data folder (see `gbif_cache_path()`),
+    so a name is only sent to GBIF again once its cached match is older than ttl_days.
+    If the cache can't be opened, names are looked up in GBIF without it.
+
+    Args:
+        species_name (str): The species name to match.
+        ttl_days (float, optional): Days before a cached match is looked up again. Defaults to GBIF_CACHE_TTL_DAYS.
+
+    Returns:
+        str: The usageKey of the match, or None if GBIF did not match the name.
+    """
+    cached = read_gbif_cache([species_name], ttl_days)
+    if species_name in cached:
+        return cached[species_name]
+    usageKey = fetch_gbif_backbone(species_name)
+    write_gbif_cache({species_name: usageKey})
+    return usageKey
+
+
+def warm_gbif_cache(species_names, workers=8, ttl_days=GBIF_CACHE_TTL_DAYS):
+    """
+    Fill the GBIF name cache for a list of names, sending the names that are not in
+    invasive_all_source and not already cached to GBIF with concurrent requests.
+
+    Args:
+        species_names (list): The species names.
+        workers (int, optional): The number of concurrent requests. Defaults to 8.
+        ttl_days (float, optional): Days before a cached match is looked up again. Defaults to GBIF_CACHE_TTL_DAYS.
+
+    Returns:
+        dict: The number of names that were "cached" already, "matched" and "unmatched"
+            by GBIF, and "failed" (request errors, not cached).
+    """
+    exact = store.derived("invasive_all_source", "name_index", build_name_index)[0]
+    names = [
+        name
+        for name in dict.fromkeys(species_names)
+        if name not in exact
+        and not (name.isdigit() or name.startswith("xx") or name.startswith("XX"))
+    ]
+    cached = read_gbif_cache(names, ttl_days)
+    names = [name for name in names if name not in cached]
+    print(f"{len(cached)} names already cached, looking up {len(names)} names in GBIF...")
+
+    def fetch(name):
+        try:
+            return fetch_gbif_backbone(name)
+        except Exception as e:
+            print(f"GBIF lookup failed for '{name}': {e}")
+            return e
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = dict(zip(names, executor.map(fetch, names)))
+    matches = {k: v for k, v in results.items() if not isinstance(v, Exception)}
+    write_gbif_cache(matches)
+
+    return {
+        "cached": len(cached),
+        "matched": sum(v is not None for v in matches.values()),
+        "unmatched": sum(v is None for v in matches.values()),
+        "failed": len(results) - len(matches),
+    }
+
+
+# Ranks for which get_all_species lists the canonicalName
+SPECIES_RANKS = ["SPECIES", "FORM", "SUBSPECIES", "VARIETY"]
+
+
+def build_all_species(invasive_all_source):
+    """
+    Build the list of get_all_species() from invasive_all_source.
+
+    The name of each row is chosen with np.select, in order of priority: canonicalName
+    (species ranks), taxonEPPO, taxonSINAS and taxonCABI. A taxonSINAS name that is
+    already in the list (from an earlier row) is replaced by the row's taxonCABI; this
+    is checked against the first row of each name and a set of the names added by
+    earlier taxonSINAS rows.
+
+    Args:
+        invasive_all_source (pandas.DataFrame): The master species list.
+
+    Returns:
+        list: The species names, in the order of invasive_all_source.
+    """
+    canonical = invasive_all_source["canonicalName"].to_numpy(dtype=object)
+    eppo = invasive_all_source["taxonEPPO"].to_numpy(dtype=object)
+    sinas = invasive_all_source["taxonSINAS"].to_numpy(dtype=object)
+    cabi = invasive_all_source["taxonCABI"].to_numpy(dtype=object)
+
+    is_rank = invasive_all_source["rank"].isin(SPECIES_RANKS).to_numpy()
+    is_eppo = ~is_rank & pd.notna(eppo)
+    is_sinas = ~is_rank & ~is_eppo & pd.notna(sinas)
+    is_cabi = ~is_rank & ~is_eppo & ~is_sinas & pd.notna(cabi)
+    names = np.select(
+        [is_rank, is_eppo, is_sinas, is_cabi], [canonical, eppo, sinas, cabi], None
+    )
+    keep = is_rank | is_eppo | is_sinas | is_cabi
+
+    # Row where each name is first added by a canonicalName, taxonEPPO or taxonCABI row
+    fixed = np.flatnonzero(keep & ~is_sinas)
+    first_row = (
+        pd.Series(fixed, index=names[fixed])
+        .loc[lambda rows: ~rows.index.duplicated()]
+        .to_dict()
+    )
+
+    # taxonSINAS names already in the list are replaced by taxonCABI
+    sinas_names = set()
+    for row in np.flatnonzero(is_sinas):
+        if first_row.get(names[row], row) < row or names[row] in sinas_names:
+            names[row] = cabi[row]
+        sinas_names.add(names[row])
+
+    return names[keep].tolist()
 
 
 def get_all_species():
     """
     Retrieve a list of all species names from the invasive_all_source DataFrame.
 
-    This function iterates through all rows in the invasive_all_source DataFrame and collects species names based on the following criteria:
+    This function collects a species name for each row of the invasive_all_source DataFrame based on the following criteria:
     - If the 'rank' column value is 'SPECIES', 'FORM', 'SUBSPECIES', or 'VARIETY', the 'canonicalName' column value is added to the list.
     - If the 'rank' column value does not match the above criteria and 'taxonEPPO' is not null, the 'taxonEPPO' column value is added to the list.
     - If 'taxonEPPO' is null and 'taxonSINAS' is not null:
@@ -160,28 +1044,14 @@ def get_all_species():
         - Otherwise, the 'taxonSINAS' column value is added to the list.
     - If 'taxonSINAS' is null and 'taxonCABI' is not null, the 'taxonCABI' column value is added to the list.
 
+    The list is built once (see `build_all_species()`) and kept in the shared store.
+
     Returns:
         list: A list of species names collected from the invasive_all_source DataFrame.
     """
-    # iterate through all rows in invasive_all_source and return a list of all species names
-    # if rank is 'SPECIES', 'FORM', 'SUBSPECIES', 'VARIETY' return canonicalName
-    # otherwise if taxonSINAS or taxonCABI is not null return that
-    # collect the result of all rows into a list and return that
-    species_list = []
-    for index, row in invasive_all_source.iterrows():
-        if row["rank"] in ["SPECIES", "FORM", "SUBSPECIES", "VARIETY"]:
-            species_list.append(row["canonicalName"])
-        elif pd.notnull(row["taxonEPPO"]):
-            species_list.append(row["taxonEPPO"])
-        elif pd.notnull(row["taxonSINAS"]):
-            # if row['taxonSINAS'] in species_list, append row['taxonCABI'] instead
-            if row["taxonSINAS"] in species_list:
-                species_list.append(row["taxonCABI"])
-            else:
-                species_list.append(row["taxonSINAS"])
-        elif pd.notnull(row["taxonCABI"]):
-            species_list.append(row["taxonCABI"])
-    return species_list
+    return list(
+        store.derived("invasive_all_source", "all_species", build_all_species)
+    )
 
 
 def check_species_exists(species_name):
@@ -197,12 +1067,58 @@ def check_species_exists(species_name):
     bool: True if the species exists in the database, False otherwise.
     """
     # function takes a species name or usageKey and checks if it exists in the database
-    if get_usageKey(species_name) in invasive_all_source["usageKey"].values:
+    if species_exists(get_usageKey(species_name)):
         return True
     else:
         return False
 
 
+def build_ISO3_flags(table):
+    """
+    Precompute the ISO3 filters of the introductions queries for every row of a records table.
+
+    Args:
+        table (pandas.DataFrame): A records table with an ISO3 column (first_records or all_records).
+
+    Returns:
+        pandas.DataFrame: Boolean columns aligned with the rows of the table:
+            "is_ISO3" (the ISO3 code has 3 characters) and "is_country" (the code is not "ZZ", "XL" or "XZ").
+    """
+    return pd.DataFrame(
+        {
+            "is_ISO3": (table["ISO3"].str.len() == 3).to_numpy(dtype=bool),
+            "is_country": (~table["ISO3"].isin(["ZZ", "XL", "XZ"])).to_numpy(),
+        }
+    )
+
+
+def select_introductions(table_name, usageKeys, ISO3_only=False):
+    """
+    Select the records of a list of species from a records table, without the "ZZ", "XL"
+    and "XZ" locations, and optionally only those with 3-character ISO3 codes.
+
+    Args:
+        table_name (str): "first_records" or "all_records".
+        usageKeys (list): The usageKeys of the species.
+        ISO3_only (bool, optional): If True, keep only records with 3-character ISO3 codes. Defaults to False.
+
+    Returns:
+        pandas.DataFrame: A copy of the selected records, grouped by usageKey in the order of usageKeys.
+    """
+    if store.backend == "sqlite":
+        where = "t.ISO3 IS NULL OR t.ISO3 NOT IN ('ZZ', 'XL', 'XZ')"
+        if ISO3_only:
+            where = f"({where}) AND length(t.ISO3) = 3"
+        return store.sql_rows(table_name, usageKeys, where=where)
+
+    positions = store.positions(table_name, usageKeys)
+    flags = store.derived(table_name, "ISO3_flags", build_ISO3_flags)
+    keep = flags["is_country"].values[positions]
+    if ISO3_only:
+        keep = keep & flags["is_ISO3"].values[positions]
+    return store.get(table_name).iloc[positions[keep]].copy()
+
+
 def get_first_introductions(
     species_name,
     check_exists=False,
@@ -236,25 +1152,60 @@ def get_first_introductions(
             )
 
     # Create DataFrame of all first introductions where usageKey matches
-    df = first_records.loc[first_records["usageKey"] == usageKey].copy()
+    df = select_introductions("first_records", [usageKey], ISO3_only)
 
-    if ISO3_only:
-        # Return DataFrame where ISO3 column is 3 characters long
-        df = df.loc[df["ISO3"].str.len() == 3]
+    if import_additional_native_info:
+        df = set_native_status(df)
+
+    return df
+
+
+def get_first_introductions_many(
+    species_names,
+    check_exists=False,
+    ISO3_only=False,
+    import_additional_native_info=True,
+):
+    """
+    Retrieve the first introduction records for many species at once.
+
+    This is the batch version of get_first_introductions: names are resolved with the name
+    index, the records of all species are selected with one usageKey index lookup, and native
+    status is attached with one join for all species. The rows for each species are the same
+    as those returned by get_first_introductions.
+
+    Args:
+        species_names (list): The names or usageKeys of the species.
+        check_exists (bool, optional): If True, raises a KeyError if any species is not in the database. Defaults to False.
+        ISO3_only (bool, optional): If True, returns only records with 3-character ISO3 codes. Defaults to False.
+        import_additional_native_info (bool, optional): If True, imports additional native range information. Defaults to True.
+
+    Returns:
+        pd.DataFrame: A DataFrame containing the first introduction records for all species, keyed by usageKey.
+
+    Raises:
+        KeyError: If check_exists is True and any species is not found in the database.
+    """
+    usageKeys = [get_usageKey(species_name) for species_name in species_names]
+    if check_exists:
+        missing = [
+            species_name
+            for species_name, usageKey in zip(species_names, usageKeys)
+            if not species_exists(usageKey)
+        ]
+        if len(missing) > 0:
+            raise KeyError(
+                f"Species not in Database: {', '.join(map(str, missing))}. Try checking master list with get_all_species()"
+            )
+
+    # Unique usageKeys, in the order they were requested
+    usageKeys = list(dict.fromkeys(k for k in usageKeys if k is not None))
+    df = select_introductions("first_records", usageKeys, ISO3_only)
 
     if import_additional_native_info:
-        native_ranges = get_native_ranges(usageKey, ISO3=df["ISO3"].unique().tolist())
-        # Remove rows where Native is NaN
-        native_ranges = native_ranges.loc[native_ranges["Native"].notna()]
-        for index, row in native_ranges.iterrows():
-            if row["Native"]:
-                df.loc[df["ISO3"] == row["ISO3"], "Native"] = True
-            else:
-                df.loc[df["ISO3"] == row["ISO3"], "Native"] = False
-        return df[~df["ISO3"].isin(["ZZ", "XL", "XZ"])]
+        df = set_native_status(df)
 
-    else:
-        return df[~df["ISO3"].isin(["ZZ", "XL", "XZ"])]
+    return df
 
 
 def get_all_introductions(
@@ -271,6 +1222,11 @@ def get_all_introductions(
     pandas.DataFrame: A DataFrame containing introduction records for the specified species, optionally filtered by ISO3 codes and native range information.
     Raises:
     KeyError: If check_exists is True and the species does not exist in the database.
+    Notes:
+    - 'all_records.csv' is read once into the shared store, with ISO3, Source and Type as categoricals,
+      and the records of the species are found with its usageKey index. Set `store.memory_map = True`
+      before the first call to memory-map the file while it is read, which can make reading it faster
+      (the whole table is still loaded into memory).
     """
     usageKey = get_usageKey(species_name)
     if check_exists == True:
@@ -288,37 +1244,45 @@ def get_all_introductions(
         usageKey = get_usageKey(usageKey)
 
     # create df of all first introductinos where usageKey = usageKey
-    if "all_records" not in globals():
-        global all_records
-    all_records = pd.read_csv(
-        r"occurrences\all_records.csv", dtype={"usageKey": str}, low_memory=False
-    )
-
-    df = all_records.loc[all_records["usageKey"] == usageKey]
     # for each unique "ISO3" in df, get the first row were year is min
     # df = df.loc[df.groupby("ISO3")["year"].idxmin()]
-    if ISO3_only == True:
-        # return df where ISO3 column is 3 characters long
-        df = df.loc[df["ISO3"].str.len() == 3]
+    df = select_introductions("all_records", [usageKey], ISO3_only)
 
     if import_additional_native_info == True:
-        native_ranges = get_native_ranges(usageKey, ISO3=df["ISO3"].unique().tolist())
-        # remove rows where Native is nan
-        # for each row in native_ranges, if native is not nan, set native in df to Native
-        native_ranges = native_ranges.loc[native_ranges["Native"].notna()]
-        for index, row in native_ranges.iterrows():
-            if row["Native"] == True:
-                df.loc[df["ISO3"] == row["ISO3"], "Native"] = True
-            else:
-                df.loc[df["ISO3"] == row["ISO3"], "Native"] = False
-        return df[~df["ISO3"].isin(["ZZ", "XL", "XZ"])]
-    else:
-        return df[~df["ISO3"].isin(["ZZ", "XL", "XZ"])]
+        df = set_native_status(df)
+
+    return df
+
+
+# Result key: table name, for the tables returned by get_ecology
+ECOLOGY_TABLES = {
+    "CABI_rainfall": "CABI_rainfall",
+    "CABI_airtemp": "CABI_airtemp",
+    "CABI_climate": "CABI_climate",
+    "CABI_environments": "CABI_environments",
+    "CABI_lat_alt": "CABI_latitude_altitude",
+    "CABI_water_tolerances": "CABI_water_tolerances",
+    "CABI_wood_packaging": "CABI_wood_packaging",
+    "DAISIE_habitats": "DAISIE_habitats",
+    "CABI_natural_enemies": "CABI_natural_enemies",
+    "CABI_plant_trade": "CABI_plant_trade",
+}
+
+# Result key: table name, for the tables returned by get_hosts_and_vectors
+HOSTS_AND_VECTORS_TABLES = {
+    "CABI_tohostPlants": "CABI_host_plants",
+    "CABI_topathwayVectors": "CABI_pathway_vectors",
+    "CABI_tovectorsAndIntermediateHosts": "CABI_vectorsAndIntermediateHosts",
+    "EPPO_hosts": "EPPO_hosts",
+    "DAISIE_pathways": "DAISIE_pathways",
+    "DAISIE_vectors": "DAISIE_vectors",
+    "CABI_topathwayCauses": "CABI_pathway_causes",
+}
 
 
 def get_ecology(species_name, check_exists=False):
     """
-    Retrieve ecological data for a given species from various CSV files.
+    Retrieve ecological data for a given species from the CABI and DAISIE trait tables.
     Args:
         species_name (str): The name of the species to retrieve data for.
         check_exists (bool, optional): If True, checks if the species exists in the database before proceeding. Defaults to False.
@@ -332,69 +1296,14 @@ def get_ecology(species_name, check_exists=False):
             raise KeyError(
                 "Species not in Database. Try checking master list with get_all_species()"
             )
-    result_dict = {}
-
     usageKey = get_usageKey(species_name)
 
-    # load csv for each of these files'CABI_rainfall', 'CABI_airtemp', 'CABI_climate', 'CABI_environments', 'CABI_lat_alt', 'CABI_water_tolerances'
-
-    CABI_rainfall = pd.read_csv(
-        r"CABI data\CABI_tables\torainfall.csv", dtype={"usageKey": "str"}
-    )
-    CABI_airtemp = pd.read_csv(
-        r"CABI data\CABI_tables\toairTemperature.csv", dtype={"usageKey": "str"}
-    )
-    CABI_climate = pd.read_csv(
-        r"CABI data\CABI_tables\toclimate.csv", dtype={"usageKey": "str"}
-    )
-    CABI_environments = pd.read_csv(
-        r"CABI data\CABI_tables\toenvironments.csv", dtype={"usageKey": "str"}
-    )
-    CABI_lat_alt = pd.read_csv(
-        r"CABI data\CABI_tables\tolatitudeAndAltitudeRanges.csv",
-        dtype={"usageKey": "str"},
-    )
-    CABI_natural_enemies = pd.read_csv(
-        r"CABI data\CABI_tables\tonaturalEnemies.csv", dtype={"usageKey": "str"}
-    )
-    CABI_water_tolerances = pd.read_csv(
-        r"CABI data\CABI_tables\towaterTolerances.csv", dtype={"usageKey": "str"}
-    )
-    CABI_wood_packaging = pd.read_csv(
-        r"CABI data\CABI_tables\towoodPackaging.csv", dtype={"usageKey": "str"}
-    )
-    DAISIE_habitats = pd.read_csv(
-        r"DAISIE data\DAISIE_habitat.csv", dtype={"usageKey": "str"}
-    )
-    CABI_plant_trade = pd.read_csv(
-        r"CABI data\CABI_tables\toplantTrade.csv", dtype={"usageKey": "str"}
-    )
-    # return a list of all rows where usageKey = usageKey
+    # return a list of all rows where usageKey = usageKey from each table
     # place rows into a dataframe and put into results_dict with key = filename
-    result_dict["CABI_rainfall"] = CABI_rainfall.loc[
-        CABI_rainfall["usageKey"] == usageKey
-    ]
-    result_dict["CABI_airtemp"] = CABI_airtemp.loc[CABI_airtemp["usageKey"] == usageKey]
-    result_dict["CABI_climate"] = CABI_climate.loc[CABI_climate["usageKey"] == usageKey]
-    result_dict["CABI_environments"] = CABI_environments.loc[
-        CABI_environments["usageKey"] == usageKey
-    ]
-    result_dict["CABI_lat_alt"] = CABI_lat_alt.loc[CABI_lat_alt["usageKey"] == usageKey]
-    result_dict["CABI_water_tolerances"] = CABI_water_tolerances.loc[
-        CABI_water_tolerances["usageKey"] == usageKey
-    ]
-    result_dict["CABI_wood_packaging"] = CABI_wood_packaging.loc[
-        CABI_wood_packaging["usageKey"] == usageKey
-    ]
-    result_dict["DAISIE_habitats"] = DAISIE_habitats.loc[
-        DAISIE_habitats["usageKey"] == usageKey
-    ]
-    result_dict["CABI_natural_enemies"] = CABI_natural_enemies.loc[
-        CABI_natural_enemies["usageKey"] == usageKey
-    ]
-    result_dict["CABI_plant_trade"] = CABI_plant_trade.loc[
-        CABI_plant_trade["usageKey"] == usageKey
-    ]
+    result_dict = {}
+    for key, table_name in ECOLOGY_TABLES.items():
+        result_dict[key] = store.rows(table_name, usageKey)
+
     # remove empty keys in result_dict
     result_dict = {k: v for k, v in result_dict.items() if not v.empty}
 
@@ -404,7 +1313,7 @@ def get_ecology(species_name, check_exists=False):
 def get_hosts_and_vectors(species_name, check_exists=False):
     """
     Retrieve host and vector information for a given species from various data sources.
-    This function queries multiple CSV files to gather information about hosts and vectors
+    This function queries multiple trait tables to gather information about hosts and vectors
     associated with a specified species. The results are returned as a dictionary of DataFrames.
     Parameters:
     species_name (str): The name of the species to query.
@@ -420,7 +1329,6 @@ def get_hosts_and_vectors(species_name, check_exists=False):
     >>> print(results.keys())
     dict_keys(['CABI_tohostPlants', 'CABI_topathwayVectors', 'CABI_tovectorsAndIntermediateHosts', 'EPPO_hosts', 'DAISIE_pathways', 'DAISIE_vectors', 'CABI_topathwayCauses'])
     """
-    os.chdir(data_path)
     if check_exists == True:
         if not check_species_exists(species_name):
             raise KeyError(
@@ -429,62 +1337,11 @@ def get_hosts_and_vectors(species_name, check_exists=False):
 
     usageKey = get_usageKey(species_name)
 
-    CABI_tohostPlants = pd.read_csv(
-        r"CABI data\CABI_tables\tohostPlants.csv", dtype={"usageKey": "str"}
-    )
-    CABI_topathwayVectors = pd.read_csv(
-        r"CABI data\CABI_tables\topathwayVectors.csv", dtype={"usageKey": "str"}
-    )
-    CABI_topathwayCauses = pd.read_csv(
-        r"CABI data\CABI_tables\topathwayCauses.csv", dtype={"usageKey": "str"}
-    )
-    CABI_tovectorsAndIntermediateHosts = pd.read_csv(
-        r"CABI data\CABI_tables\tovectorsAndIntermediateHosts.csv",
-        dtype={"usageKey": "str"},
-    )
-    EPPO_hosts = pd.read_csv(r"EPPO data\EPPO_hosts.csv", dtype={"usageKey": "str"})
-    DAISIE_pathways = pd.read_csv(
-        r"DAISIE data\DAISIE_pathways.csv", dtype={"usageKey": "str"}
-    )
-    DAISIE_vectors = pd.read_csv(
-        r"DAISIE data\DAISIE_vectors.csv", dtype={"usageKey": "str"}
-    )
-
-    ################################################################
-    # CABI Queries
-    ################################################################
-    ################################################################
+    # query each table for all rows where usageKey = usageKey
+    # place rows into a dataframe and put into results_dict with key = table name
     results_dict = {}
-    # tohostPlants
-    # query tohostPlants for all rows where usageKey = usageKey
-    # return a list of all rows where usageKey = usageKey
-    # place rows into a dataframe and put into results_dict with key 'CABI_tohostPlants'
-    results_dict["CABI_tohostPlants"] = CABI_tohostPlants.loc[
-        CABI_tohostPlants["usageKey"] == usageKey
-    ]
-    # topathwayVectors
-    # query topathwayVectors for all rows where usageKey = usageKey
-    # return a list of all rows where usageKey = usageKey
-    # place rows into a dataframe and put into results_dict with key 'CABI_topathwayVectors'
-    results_dict["CABI_topathwayVectors"] = CABI_topathwayVectors.loc[
-        CABI_topathwayVectors["usageKey"] == usageKey
-    ]
-
-    results_dict["CABI_tovectorsAndIntermediateHosts"] = (
-        CABI_tovectorsAndIntermediateHosts.loc[
-            CABI_tovectorsAndIntermediateHosts["usageKey"] == usageKey
-        ]
-    )
-    results_dict["EPPO_hosts"] = EPPO_hosts.loc[EPPO_hosts["usageKey"] == usageKey]
-    results_dict["DAISIE_pathways"] = DAISIE_pathways.loc[
-        DAISIE_pathways["usageKey"] == usageKey
-    ]
-    results_dict["DAISIE_vectors"] = DAISIE_vectors.loc[
-        DAISIE_vectors["usageKey"] == usageKey
-    ]
-    results_dict["CABI_topathwayCauses"] = CABI_topathwayCauses.loc[
-        CABI_topathwayVectors["usageKey"] == usageKey
-    ]
+    for key, table_name in HOSTS_AND_VECTORS_TABLES.items():
+        results_dict[key] = store.rows(table_name, usageKey)
 
     # remove blank dataframes from results_dict
     results_dict = {k: v for k, v in results_dict.items() if not v.empty}
@@ -492,57 +1349,116 @@ def get_hosts_and_vectors(species_name, check_exists=False):
     return results_dict
 
 
-def get_species_list(
+# Taxonomic ranks of the GBIF backbone, from highest to lowest
+TAXONOMIC_RANKS = ["kingdom", "phylum", "class", "order", "family", "genus"]
+
+
+def build_taxonomy_index(GBIF_backbone_invasive):
+    """
+    Build a dictionary of rank: {taxon name: row positions} for each taxonomic rank of
+    the GBIF backbone. The row positions of each taxon are sorted.
+    """
+    return {
+        rank: GBIF_backbone_invasive.groupby(rank, sort=False).indices
+        for rank in TAXONOMIC_RANKS
+    }
+
+
+def select_taxa(
     kingdom=None, phylum=None, taxonomic_class=None, order=None, family=None, genus=None
 ):
     """
-    Retrieves a list of species usage keys from the GBIF backbone invasive dataset
-    that match the specified taxonomic criteria.
-    Parameters:
-    kingdom (str, optional): The kingdom to filter by (e.g., 'Animalia').
-    phylum (str, optional): The phylum to filter by (e.g., 'Chordata').
-    taxonomic_class (str, optional): The class to filter by (e.g., 'Mammalia').
-    order (str, optional): The order to filter by (e.g., 'Carnivora').
-    family (str, optional): The family to filter by (e.g., 'Felidae').
+    Find the rows of the GBIF backbone that match all of the given taxa, using the
+    taxonomy index: the sorted row positions of each given taxon are intersected,
+    starting with the smallest.
+
+    Returns:
+        numpy.ndarray: The sorted row positions of the matching rows.
+    """
+    taxonomy_index = store.derived(
+        "GBIF_backbone_invasive", "taxonomy_index", build_taxonomy_index
+    )
+    criteria = dict(
+        zip(TAXONOMIC_RANKS, [kingdom, phylum, taxonomic_class, order, family, genus])
+    )
+    positions = sorted(
+        (
+            taxonomy_index[rank].get(taxon, NO_ROWS)
+            for rank, taxon in criteria.items()
+            if taxon is not None
+        ),
+        key=len,
+    )
+    if len(positions) == 0:
+        return np.arange(len(store.get("GBIF_backbone_invasive").index))
+    rows = positions[0]
+    for other in positions[1:]:
+        rows = np.intersect1d(rows, other, assume_unique=True)
+    return rows
+
+
+def get_species_list(
+    kingdom=None, phylum=None, taxonomic_class=None, order=None, family=None, genus=None
+):
+    """
+    Retrieves a list of species usage keys from the GBIF backbone invasive dataset
+    that match the specified taxonomic criteria.
+    Parameters:
+    kingdom (str, optional): The kingdom to filter by (e.g., 'Animalia').
+    phylum (str, optional): The phylum to filter by (e.g., 'Chordata').
+    taxonomic_class (str, optional): The class to filter by (e.g., 'Mammalia').
+    order (str, optional): The order to filter by (e.g., 'Carnivora').
+    family (str, optional): The family to filter by (e.g., 'Felidae').
     genus (str, optional): The genus to filter by (e.g., 'Panthera').
     Returns:
     list: A list of unique usage keys that match the specified taxonomic criteria.
+    Notes:
+    - The matching rows are found with a taxonomy index built once from the backbone (see `select_taxa()`).
     """
-    GBIF_backbone_invasive = pd.read_csv(r"GBIF data\GBIF_backbone_invasive.csv")
-
-    # CREATE LIST OF USAGE KEYS MATCHING taxonomic CRITERIA
-    # returns list of usageKeys matching taxonomic criteria
+    rows = select_taxa(kingdom, phylum, taxonomic_class, order, family, genus)
 
-    if kingdom != None:
-        GBIF_backbone_invasive = GBIF_backbone_invasive.loc[
-            GBIF_backbone_invasive["kingdom"] == kingdom
-        ]
-    if phylum != None:
-        GBIF_backbone_invasive = GBIF_backbone_invasive.loc[
-            GBIF_backbone_invasive["phylum"] == phylum
-        ]
-    if taxonomic_class != None:
-        GBIF_backbone_invasive = GBIF_backbone_invasive.loc[
-            GBIF_backbone_invasive["class"] == taxonomic_class
-        ]
+    # list of unique usageKey of the matching rows
+    usageKeys = store.get("GBIF_backbone_invasive")["usageKey"].to_numpy()
+    usageKey_list = pd.unique(usageKeys[rows]).tolist()
 
-    if order != None:
-        GBIF_backbone_invasive = GBIF_backbone_invasive.loc[
-            GBIF_backbone_invasive["order"] == order
-        ]
-    if family != None:
-        GBIF_backbone_invasive = GBIF_backbone_invasive.loc[
-            GBIF_backbone_invasive["family"] == family
-        ]
-    if genus != None:
-        GBIF_backbone_invasive = GBIF_backbone_invasive.loc[
-            GBIF_backbone_invasive["genus"] == genus
-        ]
+    return usageKey_list
 
-    # list of unique usageKey from GBIF_backbone_invasive
-    usageKey_list = GBIF_backbone_invasive["usageKey"].unique().tolist()
 
-    return usageKey_list
+def get_species_counts(
+    rank,
+    kingdom=None,
+    phylum=None,
+    taxonomic_class=None,
+    order=None,
+    family=None,
+    genus=None,
+):
+    """
+    Count the species (unique usage keys) in each taxon of a rank, optionally within the
+    specified taxonomic criteria (e.g. the number of species in each order of Insecta).
+    Parameters:
+    rank (str): The rank to group by: 'kingdom', 'phylum', 'class', 'order', 'family' or 'genus'.
+    kingdom, phylum, taxonomic_class, order, family, genus (str, optional): The taxa to filter by, as in get_species_list().
+    Returns:
+    pandas.Series: The number of species in each taxon of the rank, from largest to smallest.
+    Raises:
+    ValueError: If rank is not one of the taxonomic ranks.
+    """
+    if rank not in TAXONOMIC_RANKS:
+        raise ValueError(f"Rank '{rank}' not found. Use one of {TAXONOMIC_RANKS}")
+
+    rows = select_taxa(kingdom, phylum, taxonomic_class, order, family, genus)
+    GBIF_backbone_invasive = store.get("GBIF_backbone_invasive")
+    counts = (
+        GBIF_backbone_invasive["usageKey"]
+        .iloc[rows]
+        .groupby(GBIF_backbone_invasive[rank].iloc[rows].values)
+        .nunique()
+        .sort_values(ascending=False, kind="stable")
+    )
+    counts.index.name = rank
+    counts.name = "species"
+    return counts
 
 
 def get_native_ranges(species_name, ISO3=None, check_exists=False):
@@ -558,10 +1474,12 @@ def get_native_ranges(species_name, ISO3=None, check_exists=False):
     Raises:
     KeyError: If check_exists is True and the species does not exist in the database.
     TypeError: If ISO3 is not a list of 3 character strings.
-    UnboundLocalError: If ISO3 is missing from the bioregion crosswalk.
     Notes:
-    - The function reads data from several CSV files: 'all_sources_native_ranges.csv', 'native_range_crosswalk.csv', and 'all_records.csv'.
-    - The function uses global variables to store the data read from these CSV files.
+    - The function uses 'all_sources_native_ranges.csv', 'native_range_crosswalk.csv', and 'all_records.csv',
+      which are loaded once into the shared store.
+    - With ISO3, the status of all countries is found in one step by get_native_status(), which looks it up
+      from 'native_status.parquet' when it is current. Countries missing
+      from the bioregion crosswalk are printed and get src "ISO3 missing from bioregion crosswalk".
     """
     # as default, takes usageKey or species name as string and returns as list of native ISO3 codes
     # if ISO3 is not None, returns True or False if species is native to ISO3 - takes a list of ISO3 as input
@@ -570,29 +1488,10 @@ def get_native_ranges(species_name, ISO3=None, check_exists=False):
             raise KeyError(
                 "Species not in Database. Try checking master list with get_all_species()"
             )
-    if "native_ranges" not in globals():
-        global native_ranges
-        native_ranges = pd.read_csv(
-            r"native ranges\all_sources_native_ranges.csv",
-            dtype={"usageKey": str},
-            low_memory=False,
-        )
-        # native_ranges = native_ranges.loc[native_ranges["Native"] == True]
-
-    if "native_range_crosswalk" not in globals():
-        global native_range_crosswalk
-        native_range_crosswalk = pd.read_csv(
-            r"native ranges\native_range_crosswalk.csv", low_memory=False
-        )
-    if "all_records" not in globals():
-        global all_records
-        all_records = pd.read_csv(
-            r"occurrences\all_records.csv", dtype={"usageKey": str}, low_memory=False
-        )
     usageKey = get_usageKey(species_name)
 
     if ISO3 == None:
-        records = all_records.loc[all_records["usageKey"] == usageKey]
+        records = store.rows("all_records", usageKey)
         # filter records to non-na values of Native
         records = records.loc[records["Native"].notna()]
         # remove records where Source is "Original"
@@ -602,7 +1501,7 @@ def get_native_ranges(species_name, ISO3=None, check_exists=False):
         records["bioregion"] = None
         records["DAISIE_region"] = None
 
-        native_ranges_temp = native_ranges.loc[native_ranges["usageKey"] == usageKey]
+        native_ranges_temp = store.rows("native_ranges", usageKey)
         # filter to usageKey, source, bioregion
 
         native_ranges_temp = native_ranges_temp[
@@ -625,79 +1524,261 @@ def get_native_ranges(species_name, ISO3=None, check_exists=False):
         return records
 
     elif ISO3 != None:
-        try:
-            # if iso3 is not a list or a three character string, raise error
-            if not isinstance(ISO3, list):
-                raise TypeError("ISO3 must be a list of 3 character strings")
-            native_ranges["usageKey"] = native_ranges["usageKey"].astype(str)
-            records = all_records.loc[all_records["usageKey"] == usageKey]
-            # filter records to non-na values of Native
-            records = records.loc[records["Native"].notna()]
-            # remove records where Source is "Original"
-            records = records.loc[records["Source"] != "Original"]
-
-            records = records[["ISO3", "Source", "Native", "Reference"]]
-            records["bioregion"] = np.nan
-            records["DAISIE_region"] = np.nan
-            t_f_df = pd.DataFrame(columns=["ISO3", "Native", "src"])
-            # create list of all values of bioregion in native ranges matching usageKey
-
-            bioregions = (
-                native_ranges.loc[native_ranges["usageKey"] == usageKey]["bioregion"]
-                .unique()
-                .tolist()
-            )
-            iso_list = []
-            native_list = []
-            src_list = []
-            for iso3 in ISO3:
-                # set native to nan
-                native = np.nan
-
-                # else if bioregions list is length 1 or more
-
-                if len(bioregions) > 0:
-                    # for each bioregion in bioregions
-                    # get bioregions matching iso3 from native_range_crosswalk
-
-                    bioregions_temp = (
-                        native_range_crosswalk.loc[
-                            native_range_crosswalk["ISO3"] == iso3
-                        ]["modified_Bioregion"]
-                        .unique()
-                        .tolist()
-                    )
-                    for br in bioregions_temp:
-                        # if bioregion is in bioregions
-
-                        if br in bioregions:
-                            native = True
-                            src = "br"
-                            break
-                        else:
-                            native = False
-                            src = "br"
-                # else if bioregions list is length 0
-                if iso3 in records["ISO3"].values:
-                    native = records.loc[records["ISO3"] == iso3]["Native"].values[0]
-                    src = "records"
-                if len(bioregions) == 0 and iso3 not in records["ISO3"].values:
-                    native = np.nan
-                    src = "records only - no bioregion found"
-                # add row to t_f_df
-
-                iso_list.append(iso3)
-                native_list.append(native)
-                src_list.append(src)
-            new_df = pd.DataFrame(
-                {"ISO3": iso_list, "Native": native_list, "src": src_list}
-            )
-            t_f_df = pd.concat([t_f_df, new_df], ignore_index=True)
-            return t_f_df
-        except UnboundLocalError:
+        # if iso3 is not a list or a three character string, raise error
+        if not isinstance(ISO3, list):
+            raise TypeError("ISO3 must be a list of 3 character strings")
+
+        pairs = pd.DataFrame({"usageKey": [usageKey] * len(ISO3), "ISO3": ISO3})
+        status = get_native_status(pairs)
+
+        missing = status.loc[status["src"] == NO_CROSSWALK, "ISO3"].unique().tolist()
+        if len(missing) > 0:
             print("ISO3 missing from bioregion crosswalk")
-            print("please add" + iso3 + "to bioregion crosswalk")
-            return None
+            print("please add " + ", ".join(map(str, missing)) + " to bioregion crosswalk")
+
+        return status[["ISO3", "Native", "src"]].reset_index(drop=True)
+
+
+# src of get_native_status for countries that are not in the bioregion crosswalk
+NO_CROSSWALK = "ISO3 missing from bioregion crosswalk"
+
+
+def build_bioregions_by_ISO3(native_range_crosswalk):
+    """
+    Compile the bioregion crosswalk into a dictionary of ISO3: set of bioregions.
+    """
+    return {
+        iso3: frozenset(bioregions.dropna())
+        for iso3, bioregions in native_range_crosswalk.groupby("ISO3")[
+            "modified_Bioregion"
+        ]
+    }
+
+
+def build_bioregions_by_usageKey(native_ranges):
+    """
+    Build a dictionary of usageKey: set of native bioregions from the native ranges table.
+    Species with native range rows but no bioregion have an empty set.
+    """
+    bioregions = native_ranges["bioregion"].to_numpy()
+    return {
+        usageKey: frozenset(b for b in bioregions[positions] if pd.notna(b))
+        for usageKey, positions in native_ranges.groupby(
+            "usageKey", sort=False
+        ).indices.items()
+    }
+
+
+# Tables that the native status table (occurrences/native_status.parquet) is built from
+NATIVE_STATUS_SOURCES = ["all_records", "native_ranges", "native_range_crosswalk"]
+
+
+def native_status_is_current():
+    """
+    Check if the native status table exists and is newer than the tables it was built from.
+
+    Returns:
+        bool: True if the native status table can be used to look up native status.
+    """
+    path = os.path.join(store.data_path, TABLES["native_status"][0])
+    if not os.path.exists(path):
+        return False
+    built = os.path.getmtime(path)
+    for table_name in NATIVE_STATUS_SOURCES:
+        source = os.path.join(store.data_path, TABLES[table_name][0])
+        if os.path.exists(source) and os.path.getmtime(source) > built:
+            return False
+    return True
+
+
+def get_native_status(pairs):
+    """
+    Find the native status of many (usageKey, ISO3) pairs at once.
+
+    If the native status table written by `write_native_status()` is current, the status
+    of the pairs is looked up from it. Pairs that are not in the table have no records,
+    so their status only comes from the native bioregions. Otherwise the status is
+    computed with `compute_native_status()`.
+
+    Args:
+        pairs (pandas.DataFrame): A DataFrame with usageKey and ISO3 columns.
+
+    Returns:
+        pandas.DataFrame: The usageKey, ISO3, Native (True, False or NaN) and src of each row of pairs.
+    """
+    pairs = pairs[["usageKey", "ISO3"]]
+    # The SQLite database always has the native status table
+    if store.backend != "sqlite" and not native_status_is_current():
+        return compute_native_status(pairs)
+
+    usageKeys = pairs["usageKey"].unique().tolist()
+    status = pairs.merge(
+        store.rows_many("native_status", usageKeys),
+        how="left",
+        on=["usageKey", "ISO3"],
+    )
+    status.index = pairs.index
+    status["Native"] = status["Native"].to_numpy(dtype=object, na_value=np.nan)
+
+    missing = status["src"].isna().values
+    if missing.any():
+        computed = compute_native_status(pairs.loc[missing], use_records=False)
+        status.loc[missing, "Native"] = computed["Native"].values
+        status.loc[missing, "src"] = computed["src"].values
+    return status
+
+
+def compute_native_status(pairs, use_records=True):
+    """
+    Compute the native status of many (usageKey, ISO3) pairs from the records, native
+    ranges and bioregion crosswalk tables.
+
+    The status follows the rules of get_native_ranges(usageKey, ISO3=[...]), and src
+    gives the evidence used:
+    - "records": there is a record for the species in the country with a Native value
+      (other than the "Original" native range records), and the first such record gives
+      the status.
+    - "br": otherwise, if the species has native bioregions, it is native (True) in a
+      country that is in one of those bioregions and not native (False) in the other
+      countries of the bioregion crosswalk.
+    - "ISO3 missing from bioregion crosswalk": the species has native bioregions but the
+      country is not in the crosswalk, so the status is unknown (NaN).
+    - "records only - no bioregion found": the species has no native bioregions and no
+      record in the country, so the status is unknown (NaN).
+
+    Args:
+        pairs (pandas.DataFrame): A DataFrame with usageKey and ISO3 columns.
+        use_records (bool, optional): If False, skip the records and only use the native
+            bioregions (for pairs known to have no records). Defaults to True.
+
+    Returns:
+        pandas.DataFrame: The usageKey, ISO3, Native (True, False or NaN) and src of each row of pairs.
+    """
+    pairs = pairs[["usageKey", "ISO3"]]
+    native = np.full(len(pairs.index), np.nan, dtype=object)
+
+    # Status from records: first record with a Native value for each species-country pair
+    if use_records:
+        usageKeys = pairs["usageKey"].unique().tolist()
+        records = store.rows_many("all_records", usageKeys)
+        records = records.loc[
+            records["Native"].notna() & (records["Source"] != "Original"),
+            ["usageKey", "ISO3", "Native"],
+        ].drop_duplicates(subset=["usageKey", "ISO3"])
+        native = pairs.merge(records, how="left", on=["usageKey", "ISO3"])[
+            "Native"
+        ].to_numpy(dtype=object, na_value=np.nan, copy=True)
+        native[pairs["ISO3"].isna().values] = np.nan
+    from_records = pd.notna(native)
+
+    # Status from bioregions: is one of the country's bioregions a native bioregion?
+    if store.backend == "sqlite":
+        bioregions_by_ISO3 = build_bioregions_by_ISO3(
+            store.sql_rows(
+                "native_range_crosswalk",
+                pairs["ISO3"].dropna().unique().tolist(),
+                key_column="ISO3",
+            )
+        )
+        bioregions_by_usageKey = build_bioregions_by_usageKey(
+            store.rows_many("native_ranges", pairs["usageKey"].unique().tolist())
+        )
+    else:
+        bioregions_by_ISO3 = store.derived(
+            "native_range_crosswalk", "bioregions_by_ISO3", build_bioregions_by_ISO3
+        )
+        bioregions_by_usageKey = store.derived(
+            "native_ranges", "bioregions_by_usageKey", build_bioregions_by_usageKey
+        )
+    has_bioregions = pairs["usageKey"].isin(bioregions_by_usageKey.keys()).values
+    in_crosswalk = pairs["ISO3"].isin(bioregions_by_ISO3.keys()).values
+    from_bioregions = ~from_records & has_bioregions & in_crosswalk
+    native[from_bioregions] = [
+        not bioregions_by_ISO3[iso3].isdisjoint(bioregions_by_usageKey[usageKey])
+        for usageKey, iso3 in zip(
+            pairs["usageKey"].values[from_bioregions],
+            pairs["ISO3"].values[from_bioregions],
+        )
+    ]
+
+    src = np.select(
+        [from_records, from_bioregions, has_bioregions],
+        ["records", "br", NO_CROSSWALK],
+        default="records only - no bioregion found",
+    )
+    return pd.DataFrame(
+        {
+            "usageKey": pairs["usageKey"].values,
+            "ISO3": pairs["ISO3"].values,
+            "Native": native,
+            "src": src,
+        },
+        index=pairs.index,
+    )
+
+
+def set_native_status(df):
+    """
+    Set the Native column of a table of records from get_native_status, for the
+    species-country pairs whose native status is known.
+
+    Args:
+        df (pandas.DataFrame): Records with usageKey, ISO3 and Native columns.
+
+    Returns:
+        pandas.DataFrame: The records with the updated Native column.
+    """
+    pairs = df[["usageKey", "ISO3"]].drop_duplicates()
+    status = pd.Series(
+        get_native_status(pairs)["Native"].values,
+        index=pd.MultiIndex.from_frame(pairs),
+    )
+    native = status.reindex(pd.MultiIndex.from_frame(df[["usageKey", "ISO3"]])).values
+    known = pd.notna(native)
+    if known.any():
+        df = df.copy()
+        df["Native"] = df["Native"].astype("boolean")
+        df.loc[known, "Native"] = native[known].astype(bool)
+    return df
+
+
+def write_native_status(data_dir=None):
+    """
+    Compute the native status of every species-country pair in all_records and write it
+    to "occurrences/native_status.parquet", so that the query functions look it up
+    instead of computing it. This is run by `4_consolidate_all_occurence.py` after
+    all_records is written.
+
+    Args:
+        data_dir (str, optional): The GIATAR data folder. Defaults to the data path of the shared store.
+
+    Returns:
+        pandas.DataFrame: The usageKey, ISO3, Native and src of every pair.
+    """
+    if data_dir is not None:
+        store.set_data_path(data_dir)
+    for table_name in NATIVE_STATUS_SOURCES:
+        store.clear(table_name)
+
+    pairs = (
+        store.get("all_records")[["usageKey", "ISO3"]]
+        .drop_duplicates()
+        .sort_values(["usageKey", "ISO3"])
+        .reset_index(drop=True)
+    )
+    status = compute_native_status(pairs)
+    status["Native"] = status["Native"].astype("boolean")
+
+    status.to_parquet(
+        os.path.join(store.data_path, TABLES["native_status"][0]), index=False
+    )
+    store.clear("native_status")
+
+    return status
+
+
+# Table name: column of common names, for the tables returned by get_common_names
+COMMON_NAME_COLUMNS = {"DAISIE_vernacular": "name", "EPPO_names": "fullname"}
 
 
 def get_common_names(species_name, check_exists=False):
@@ -710,6 +1791,9 @@ def get_common_names(species_name, check_exists=False):
         KeyError: If check_exists is True and the species is not found in the database.
     Returns:
         dict: A dictionary containing DataFrames of common names from DAISIE and EPPO databases, keyed by their source names.
+    Notes:
+        Both tables are loaded once into the shared store, and the rows of the species are found with their usageKey index.
+        To find taxa from a common name, use `get_usageKeys_by_common_name()`.
     """
     if check_exists == True:
         if not check_species_exists(species_name):
@@ -719,29 +1803,70 @@ def get_common_names(species_name, check_exists=False):
 
     usageKey = get_usageKey(species_name)
 
-    DAISIE_vernacular = pd.read_csv(
-        r"DAISIE data\DAISIE_vernacular_names.csv",
-        dtype={"usageKey": str},
-        low_memory=False,
-    )
-    EPPO_names = pd.read_csv(
-        r"EPPO data\EPPO_names.csv", dtype={"usageKey": str}, low_memory=False
-    )
     results_dict = {}
-
-    # if usagekey in daisie, print "in daisie"
-    print(DAISIE_vernacular.head())
-    if usageKey in DAISIE_vernacular["usageKey"].values:
-        print("in daisie")
-
-    results_dict["DAISIE_vernacular"] = DAISIE_vernacular.loc[
-        DAISIE_vernacular["usageKey"] == usageKey
-    ]
-    results_dict["EPPO_names"] = EPPO_names.loc[EPPO_names["usageKey"] == usageKey]
+    for table_name in COMMON_NAME_COLUMNS:
+        results_dict[table_name] = store.rows(table_name, usageKey)
     results_dict = {k: v for k, v in results_dict.items() if not v.empty}
     return results_dict
 
 
+def normalize_common_name(name):
+    """
+    Case-fold a common name and treat hyphens as spaces, for matching common names
+    however they are written (e.g. "Box-tree  Moth" -> "box tree moth").
+    """
+    return " ".join(str(name).casefold().replace("-", " ").split())
+
+
+def build_common_name_index(table, column):
+    """
+    Build a dictionary of normalized common name: usageKeys from a table of common names.
+
+    Args:
+        table (pandas.DataFrame): A table of common names with a usageKey column.
+        column (str): The column holding the common names.
+
+    Returns:
+        dict: The usageKeys of each normalized name (see `normalize_common_name()`),
+            without duplicates, in the order of the table.
+    """
+    names = table[[column, "usageKey"]].dropna()
+    names = pd.DataFrame(
+        {
+            "name": [normalize_common_name(name) for name in names[column].tolist()],
+            "usageKey": names["usageKey"].values,
+        }
+    ).drop_duplicates()
+    return names.groupby("name", sort=False)["usageKey"].agg(list).to_dict()
+
+
+def get_usageKeys_by_common_name(common_name):
+    """
+    Find the taxa with a given common name, in any language, in the DAISIE vernacular
+    names and EPPO names tables.
+
+    Names are matched after `normalize_common_name()`, so "box tree moth" also matches
+    "Box-tree moth". The lookup uses a reverse index of each table that is built once
+    and kept in the shared store.
+
+    Args:
+        common_name (str): The common name to look up.
+
+    Returns:
+        list: The usageKeys of the taxa with that common name (empty if there are none).
+    """
+    name = normalize_common_name(common_name)
+    usageKeys = []
+    for table_name, column in COMMON_NAME_COLUMNS.items():
+        index = store.derived(
+            table_name,
+            "common_name_index",
+            lambda table: build_common_name_index(table, column),
+        )
+        usageKeys += index.get(name, [])
+    return list(dict.fromkeys(usageKeys))
+
+
 def get_trait_table_list():
     """
     Returns a list of trait table names.
@@ -752,39 +1877,16 @@ def get_trait_table_list():
     Returns:
         list: A list of strings representing the names of trait tables.
     """
-    return [
-        "CABI_rainfall",
-        "CABI_airtemp",
-        "CABI_climate",
-        "CABI_environments",
-        "CABI_latitude_altitude",
-        "CABI_natural_enemies",
-        "CABI_water_tolerances",
-        "CABI_wood_packaging",
-        "CABI_host_plants",
-        "CABI_pathway_vectors",
-        "CABI_vectorsAndIntermediateHosts",
-        "DAISIE_habitats",
-        "CABI_impact_summary",
-        "CABI_latitude_altitude_ranges",
-        "CABI_symptoms_signs",
-        "CABI_threatened_species",
-        "EPPO_hosts",
-        "EPPO_names",
-        "DAISIE_pathways",
-        "DAISIE_vectors",
-        "DAISIE_vernacular",
-    ]
+    return list(TRAIT_TABLES)
 
 
 # Function to select a specific trait table
 def get_trait_table(table_name, usageKey=None):
     """
     Retrieve a trait table by its name and optionally filter by usageKey.
-    This function loads a specified trait table from a CSV file if it has not
-    been loaded already. If the table is already loaded, it retrieves it from
-    the global namespace. Optionally, it can filter the table rows based on
-    the provided usageKey.
+    The file and dtypes of each table are registered in TABLES. The table is loaded
+    into the shared store the first time it is requested, and rows for a usageKey are
+    found with the table's usageKey index.
     Parameters:
     table_name (str): The name of the trait table to retrieve.
     usageKey (str, optional): The usageKey to filter the table rows. Defaults to None.
@@ -792,67 +1894,663 @@ def get_trait_table(table_name, usageKey=None):
     pandas.DataFrame: The requested trait table, optionally filtered by usageKey.
     Raises:
     ValueError: If the table name is not found in the list of available tables.
-    ValueError: If the file path for the specified table name is not specified.
     """
-    if table_name not in get_trait_table_list():
+    if table_name not in TRAIT_TABLES:
         raise ValueError(f"Table name '{table_name}' not found.")
 
-    # Check if the table has already been loaded
-    if table_name in globals():
-        table = globals()[table_name]
-    else:
-        file_path = None
-        if table_name == "CABI_rainfall":
-            file_path = "CABI data/CABI_tables/torainfall.csv"
-        elif table_name == "CABI_airtemp":
-            file_path = "CABI data/CABI_tables/toairTemperature.csv"
-        elif table_name == "CABI_latitude_altitude":
-            file_path = "CABI data/CABI_tables/tolatitudeAndAltitudeRanges.csv"
-        # Add similar conditions for other tables
-
-        if file_path is not None:
-            table = pd.read_csv(file_path, dtype={"usageKey": str})
-            globals()[table_name] = table
-        else:
-            raise ValueError(f"File path for table '{table_name}' is not specified.")
-
     # Filter rows based on usageKey if provided
     if usageKey is not None:
-        table = table[table["usageKey"] == usageKey]
+        return store.rows(table_name, usageKey)
+
+    return store.get(table_name)
 
-    return table
 
+# Zenodo API record of the latest version of the GIATAR dataset
+GIATAR_RECORD_URL = "https://zenodo.org/api/records/13138446"
 
-def get_GIATAR_current(data_dir=os.getcwd()):
+# File (inside the data folder) recording the dataset version downloaded by get_GIATAR_current()
+DOWNLOAD_MANIFEST = "giatar_download.json"
+
+
+def file_checksum(file_path, algorithm="md5", chunk_size=1 << 20):
+    """
+    Compute the checksum of a file, reading it in chunks.
+    """
+    digest = hashlib.new(algorithm)
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def download_file(url, file_path, size=None, chunk_size=1 << 20):
+    """
+    Stream a file to disk in chunks. If a partial download of the file exists at
+    file_path + ".part", the download resumes from where it stopped (with an HTTP Range
+    request), and starts again if the server does not support ranges.
+
+    Args:
+        url (str): The URL of the file.
+        file_path (str): The path to save the file to.
+        size (int, optional): The expected size of the file in bytes, if known.
+        chunk_size (int, optional): Bytes written at a time. Defaults to 1 MB.
+
+    Returns:
+        bool: True if the file was downloaded.
+    """
+    part_path = file_path + ".part"
+    done = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    if size is not None and done > size:
+        # Longer than the file: a partial download of another version
+        done = 0
+
+    if size is None or done < size:
+        headers = {"Range": f"bytes={done}-"} if done > 0 else {}
+        with requests.get(url, headers=headers, stream=True, timeout=60) as response:
+            if response.status_code == 206:
+                mode = "ab"
+                print(f"Resuming download at {done} bytes...")
+            elif response.status_code == 200:
+                mode = "wb"
+                done = 0
+            else:
+                print(f"Failed to download {url}. Status code: {response.status_code}")
+                return False
+            with open(part_path, mode) as f:
+                for chunk in response.iter_content(chunk_size=chunk_size):
+                    f.write(chunk)
+                    done += len(chunk)
+
+    os.replace(part_path, file_path)
+    return True
+
+
+def zip_matches(zip_path, size=None, checksum=None):
+    """
+    Check a zip file against the size and checksum of a file in a Zenodo record
+    (checksums look like "md5:<hex digest>"). Missing values are not checked.
+    """
+    if size is not None and os.path.getsize(zip_path) != size:
+        return False
+    if checksum is not None:
+        algorithm, expected = checksum.split(":", 1)
+        return file_checksum(zip_path, algorithm) == expected
+    return True
+
+
+def select_zip_members(names, folders=None):
+    """
+    Select the members of a zip file that are inside any of the given folders (e.g.
+    "occurrences" or "native ranges"), at any depth of the archive. All members are
+    selected if folders is None.
+    """
+    if folders is None:
+        return list(names)
+    prefixes = ["/" + folder.strip("/") + "/" for folder in folders]
+    return [
+        name for name in names if any(prefix in "/" + name for prefix in prefixes)
+    ]
+
+
+def get_GIATAR_current(
+    data_dir=os.getcwd(),
+    folders=None,
+    record_url=GIATAR_RECORD_URL,
+    force=False,
+    keep_zip=False,
+):
     """
     Download the latest version of the GIATAR dataset from Zenodo and extract it to the given directory.
     If the files already exist, they will be overwritten.
 
+    The zip file is streamed to disk, and an interrupted download is resumed on the next
+    call. The zip is checked against the checksum in the Zenodo record before it is
+    extracted. A zip file already in data_dir (see keep_zip) is only reused if it matches
+    the size and checksum in the record, and is downloaded again otherwise. The version
+    that was extracted is recorded in "giatar_download.json" in data_dir, and the
+    download is skipped if that version (and folders) are already there.
+
     Args:
         data_dir (str): The directory where the dataset will be extracted. The default is the current working directory.
+        folders (list, optional): Only extract these folders of the dataset (e.g. ["occurrences"]). Defaults to all folders.
+        record_url (str, optional): The Zenodo API URL of the dataset record. Defaults to GIATAR_RECORD_URL.
+        force (bool, optional): If True, download and extract even if the same version is already there. Defaults to False.
+        keep_zip (bool, optional): If True, keep the zip file in data_dir after extracting it. Defaults to False.
 
     Returns:
-        None
+        dict: The download manifest, or None if the download failed.
     """
-    url = "https://zenodo.org/api/records/13138446"
-    response = requests.get(url)
-    if response.status_code == 200:
-        data = response.json()
-        zip_url = data["files"][0]["links"]["self"]
+    response = requests.get(record_url, timeout=60)
+    if response.status_code != 200:
+        print(
+            f"Failed to retrieve GIATAR dataset information. Status code: {response.status_code}"
+        )
+        return None
+    data = response.json()
+    zip_file = data["files"][0]
+    version = data.get("metadata", {}).get("version", data.get("id"))
+    checksum = zip_file.get("checksum")
+
+    # Skip the download if this version (and these folders) were already extracted
+    manifest_path = os.path.join(data_dir, DOWNLOAD_MANIFEST)
+    extracted = []
+    if os.path.exists(manifest_path) and not force:
+        try:
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+        except ValueError:
+            # A manifest cut short: download again
+            manifest = {}
+        # Manifests written by older versions, or cut short, may miss keys
+        if (
+            manifest.get("record") == data.get("id")
+            and manifest.get("version") == version
+            and manifest.get("checksum") == checksum
+            and "folders" in manifest
+        ):
+            if manifest["folders"] is None or (
+                folders is not None and set(folders) <= set(manifest["folders"])
+            ):
+                print(f"GIATAR dataset version {version} is already in {data_dir}.")
+                return manifest
+            extracted = manifest["folders"]
+
+    os.makedirs(data_dir, exist_ok=True)
+    zip_url = zip_file["links"]["self"]
+    zip_path = os.path.join(data_dir, zip_file.get("key", "GIATAR.zip"))
+    size = zip_file.get("size")
+
+    # A zip kept from an earlier call may be of another version of the dataset
+    if os.path.exists(zip_path):
+        if zip_matches(zip_path, size, checksum):
+            print(f"Using the GIATAR zip file already in {data_dir}.")
+        else:
+            print(f"The GIATAR zip file in {data_dir} is not version {version}.")
+            os.remove(zip_path)
+    if not os.path.exists(zip_path):
         print(f"Found dataset at {zip_url}. Downloading GIATAR dataset...")
-        zip_response = requests.get(zip_url)
-        if zip_response.status_code == 200:
-            with zipfile.ZipFile(io.BytesIO(zip_response.content)) as z:
-                z.extractall(data_dir)
-            print("GIATAR dataset downloaded and extracted successfully.")
+        if not download_file(zip_url, zip_path, size=size):
+            return None
+        if not zip_matches(zip_path, size, checksum):
+            os.remove(zip_path)
+            print("Downloaded GIATAR zip file does not match its checksum. Please try again.")
+            return None
+
+    with zipfile.ZipFile(zip_path) as z:
+        members = select_zip_members(z.namelist(), folders)
+        z.extractall(data_dir, members=members)
+    if not keep_zip:
+        os.remove(zip_path)
+    print(f"GIATAR dataset downloaded and extracted successfully ({len(members)} files).")
+
+    manifest = {
+        "record": data.get("id"),
+        "version": version,
+        "file": zip_file.get("key"),
+        "checksum": checksum,
+        "folders": None if folders is None else sorted(set(extracted) | set(folders)),
+        "downloaded": date.today().isoformat(),
+    }
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def write_parquet_snapshot(data_dir=None):
+    """
+    Write a Parquet copy of every CSV table in the GIATAR data folder, with a manifest.
+
+    The copy is written to the "parquet" folder inside the data folder, with the same
+    sub-folders and file names as the CSVs. Registered tables keep the dtypes from
+    TABLES (e.g. usageKey as a string) and TABLE_SCHEMAS (e.g. categorical ISO3).
+    Once the snapshot exists, the query functions read tables from it. A table whose
+    CSV is newer than its snapshot is read from the CSV until the snapshot is written
+    again.
+
+    Args:
+        data_dir (str, optional): The GIATAR data folder. Defaults to the data path of the shared store.
+
+    Returns:
+        dict: The manifest, with one entry per CSV file that was converted.
+    """
+    if data_dir is None:
+        data_dir = store.data_path
+    snapshot_dir = os.path.join(data_dir, SNAPSHOT_DIR)
+    os.makedirs(snapshot_dir, exist_ok=True)
+    read_args_by_path = {file_path: read_args for file_path, read_args in TABLES.values()}
+
+    files = {}
+    for root, dirs, filenames in os.walk(data_dir):
+        # Don't convert the snapshot folder itself
+        dirs[:] = sorted(d for d in dirs if os.path.join(root, d) != snapshot_dir)
+        for filename in sorted(filenames):
+            if not filename.lower().endswith(".csv"):
+                continue
+            source = os.path.join(root, filename)
+            file_path = os.path.relpath(source, data_dir).replace(os.sep, "/")
+
+            # Keep all columns in the snapshot
+            read_args = dict(read_args_by_path.get(file_path, {"low_memory": False}))
+            read_args.pop("usecols", None)
+            try:
+                table = pd.read_csv(source, **read_args)
+            except (pd.errors.ParserError, UnicodeDecodeError, ValueError) as e:
+                print(f"Skipping {file_path}: {e}")
+                continue
+            for table_name, (table_path, _) in TABLES.items():
+                if table_path == file_path and table_name in TABLE_SCHEMAS:
+                    table = apply_schema(
+                        table, TABLE_SCHEMAS[table_name], report=True, name=table_name
+                    )
+
+            # Parquet needs one type per column: store mixed-type columns as strings
+            for col in table.select_dtypes(include="object").columns:
+                if pd.api.types.infer_dtype(table[col], skipna=True) not in [
+                    "string",
+                    "boolean",
+                    "empty",
+                ]:
+                    table[col] = table[col].where(
+                        table[col].isna(), table[col].astype(str)
+                    )
+
+            parquet_path = file_path[:-4] + ".parquet"
+            os.makedirs(
+                os.path.dirname(os.path.join(snapshot_dir, parquet_path)), exist_ok=True
+            )
+            table.to_parquet(os.path.join(snapshot_dir, parquet_path), index=False)
+
+            files[file_path] = {
+                "path": parquet_path,
+                "rows": len(table.index),
+                "columns": {col: str(dtype) for col, dtype in table.dtypes.items()},
+                "source_size": os.path.getsize(source),
+                "source_mtime": os.path.getmtime(source),
+            }
+            print(f"{file_path}: {len(table.index)} rows")
+
+    manifest = {"created": date.today().isoformat(), "files": files}
+    with open(os.path.join(snapshot_dir, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    # Re-read tables from the new snapshot on next use
+    store.clear()
+
+    return manifest
+
+
+def write_sqlite_database(data_dir=None):
+    """
+    Write the GIATAR tables to a SQLite database in the data folder, for the "sqlite"
+    backend of the store (`store.backend = "sqlite"`).
+
+    The database holds every registered table that is in the data folder, with indexes
+    on usageKey, ISO3 and year, plus:
+        native_status: the native status of every species-country pair in all_records,
+        species_names / species_names_normalized: the name index used by get_usageKey,
+        "<table>_text": the searched text of each row of the TEXT_COLUMNS tables, with
+            a "<table>_trigram" FTS5 index if SQLite has the trigram tokenizer.
+    The database is written to a temporary file and then moved into place, so that
+    readers never see a partial database.
+
+    Args:
+        data_dir (str, optional): The GIATAR data folder. Defaults to the data path of the shared store.
+
+    Returns:
+        dict: The number of rows written to each table.
+    """
+    if data_dir is not None:
+        store.set_data_path(data_dir)
+    db_path = os.path.join(store.data_path, SQLITE_FILE)
+    tmp_path = db_path + ".tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    counts = {}
+    with closing(sqlite3.connect(tmp_path)) as connection:
+
+        def write_table(table_name, table):
+            # SQLite has no categorical type: store the categories' values
+            for col in table.select_dtypes(include="category").columns:
+                table[col] = table[col].astype(object)
+            table.to_sql(table_name, connection, index=False, chunksize=10000)
+            for col in ["usageKey", "ISO3", "year"]:
+                if col in table.columns:
+                    connection.execute(
+                        f'CREATE INDEX "{table_name}_{col}" ON "{table_name}" ("{col}")'
+                    )
+            counts[table_name] = len(table.index)
+            print(f"{table_name}: {len(table.index)} rows")
+
+        for table_name, (file_path, _) in TABLES.items():
+            if table_name == "native_status":
+                continue
+            if not os.path.exists(os.path.join(store.data_path, file_path)):
+                print(f"Skipping {table_name}: {file_path} not found")
+                continue
+            write_table(table_name, store.load(table_name))
+
+        # Native status of every pair in all_records
+        if native_status_is_current():
+            status = store.load("native_status")
         else:
-            print(
-                f"Failed to download GIATAR zip file. Status code: {zip_response.status_code}"
+            status = write_native_status()
+        write_table("native_status", status)
+        connection.execute(
+            'CREATE UNIQUE INDEX "native_status_pair" ON native_status (usageKey, ISO3)'
+        )
+
+        # Name index of get_usageKey
+        exact, normalized = build_name_index(store.get("invasive_all_source"))
+        for table_name, names in [
+            ("species_names", exact),
+            ("species_names_normalized", normalized),
+        ]:
+            connection.execute(
+                f"CREATE TABLE {table_name} (name TEXT PRIMARY KEY, usageKey TEXT)"
             )
-    else:
-        print(
-            f"Failed to retrieve GIATAR dataset information. Status code: {response.status_code}"
+            connection.executemany(
+                f"INSERT INTO {table_name} VALUES (?, ?)", names.items()
+            )
+            counts[table_name] = len(names)
+
+        # Searched text of the host, pathway and vector tables
+        has_trigrams = True
+        for table_name, columns in TEXT_COLUMNS.items():
+            if table_name not in counts:
+                continue
+            table = store.get(table_name)
+            text = table[columns[0]]
+            for col in columns[1:]:
+                text = text + ": " + table[col]
+            rows = [
+                (rowid, t)
+                for rowid, t in zip(range(1, len(text) + 1), text.tolist())
+                if not pd.isna(t)
+            ]
+            connection.execute(
+                f'CREATE TABLE "{table_name}_text" (rowid INTEGER PRIMARY KEY, text TEXT)'
+            )
+            connection.executemany(
+                f'INSERT INTO "{table_name}_text" VALUES (?, ?)', rows
+            )
+            if has_trigrams:
+                try:
+                    connection.execute(
+                        f'CREATE VIRTUAL TABLE "{table_name}_trigram" USING '
+                        f"fts5(text, content='{table_name}_text', content_rowid='rowid', "
+                        "tokenize='trigram')"
+                    )
+                    connection.execute(
+                        f'INSERT INTO "{table_name}_trigram" ("{table_name}_trigram") '
+                        "VALUES ('rebuild')"
+                    )
+                except sqlite3.OperationalError as e:
+                    print(f"No trigram index (SQLite without FTS5 trigrams): {e}")
+                    has_trigrams = False
+            counts[table_name + "_text"] = len(rows)
+
+        connection.commit()
+
+    os.replace(tmp_path, db_path)
+    # Reconnect to the new database on next use
+    store._sql = threading.local()
+
+    return counts
+
+
+# Table name: columns searched by get_taxa_by_host, get_taxa_by_pathway and get_taxa_by_vector
+# Several columns are searched as one text joined by ": " (e.g. "Vector: Notes")
+TEXT_COLUMNS = {
+    "CABI_host_plants": ["Plant name"],
+    "EPPO_hosts": ["full_name"],
+    "CABI_pathway_vectors": ["Vector", "Notes"],
+    "DAISIE_pathways": ["pathway"],
+    "CABI_pathway_causes": ["Cause", "Notes"],
+    "CABI_vectorsAndIntermediateHosts": ["Vector"],
+}
+
+# Characters that make a search pattern a regular expression rather than plain text
+REGEX_CHARACTERS = set(".^$*+?{}[]\\|()")
+
+
+def ngrams(text, n=3):
+    """
+    Return the set of n-character substrings of a text.
+    """
+    return {text[i : i + n] for i in range(len(text) - n + 1)}
+
+
+def build_text_index(table, columns):
+    """
+    Build a trigram index of the text searched in a table.
+
+    The text of each row is the value of the column, or the values of the columns
+    joined by ": " (missing if any of them is missing). Each distinct text is split
+    into case-folded trigrams, and each trigram points to the texts that contain it.
+
+    Args:
+        table (pandas.DataFrame): The table to index.
+        columns (list): The columns that are searched.
+
+    Returns:
+        dict: The index, with:
+            "texts": the distinct texts, in order of first appearance,
+            "text_of_row": the position in "texts" of the text of each row (-1 if missing),
+            "rows_of_text": the row positions of each text,
+            "usageKeys": the usageKey of each row,
+            "trigrams": a dictionary of trigram: positions in "texts" of the texts containing it.
+    """
+    text = table[columns[0]]
+    for col in columns[1:]:
+        text = text + ": " + table[col]
+
+    codes, texts = pd.factorize(text, use_na_sentinel=True)
+    rows_of_text = pd.Series(np.arange(len(codes))).groupby(codes).indices
+
+    trigrams = {}
+    for i, t in enumerate(texts):
+        for gram in ngrams(t.casefold()):
+            trigrams.setdefault(gram, []).append(i)
+
+    return {
+        "texts": np.asarray(texts, dtype=object),
+        "text_of_row": codes,
+        "rows_of_text": [rows_of_text[i] for i in range(len(texts))],
+        "usageKeys": table["usageKey"].to_numpy(dtype=object),
+        "trigrams": {
+            gram: np.array(ids, dtype=np.int32) for gram, ids in trigrams.items()
+        },
+    }
+
+
+def write_text_index(index, path, source_mtime):
+    """
+    Save a text index (see `build_text_index()`) as `path`.npz, with the row positions
+    and trigram postings concatenated into flat arrays, and `path`.json, with the texts,
+    usageKeys, trigrams and the modification time of the table's file. Neither file
+    holds pickled objects, so reading them can't run code. The files are written to
+    temporary files first, which are removed if they can't be written.
+
+    Raises:
+        OSError: If the files can't be written (e.g. in a read-only data folder).
+    """
+    rows_of_text = index["rows_of_text"]
+    postings = list(index["trigrams"].values())
+    tmp_paths = [path + ".npz.tmp", path + ".json.tmp"]
+    try:
+        with open(tmp_paths[0], "wb") as f:
+            np.savez(
+                f,
+                text_of_row=index["text_of_row"],
+                rows=np.concatenate([NO_ROWS] + rows_of_text),
+                row_offsets=np.cumsum([0] + [len(rows) for rows in rows_of_text]),
+                postings=np.concatenate([np.array([], dtype=np.int32)] + postings),
+                posting_offsets=np.cumsum([0] + [len(ids) for ids in postings]),
+            )
+        with open(tmp_paths[1], "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "source_mtime": source_mtime,
+                    "texts": index["texts"].tolist(),
+                    "usageKeys": index["usageKeys"].tolist(),
+                    "trigrams": list(index["trigrams"]),
+                },
+                f,
+            )
+        os.replace(tmp_paths[0], path + ".npz")
+        # Replaced last: an index is only read back once its JSON file is in place
+        os.replace(tmp_paths[1], path + ".json")
+    except OSError:
+        for tmp_path in tmp_paths:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        raise
+
+
+def read_text_index(path, source_mtime):
+    """
+    Read a text index saved by `write_text_index()`.
+
+    Returns:
+        dict: The index, or None if it is missing, unreadable, or was saved for
+            another version of the table's file.
+    """
+    try:
+        with open(path + ".json", encoding="utf-8") as f:
+            saved = json.load(f)
+        if saved["source_mtime"] != source_mtime:
+            return None
+        with np.load(path + ".npz", allow_pickle=False) as arrays:
+            arrays = dict(arrays)
+    except (OSError, ValueError, KeyError):
+        return None
+
+    row_offsets = arrays["row_offsets"]
+    posting_offsets = arrays["posting_offsets"]
+    if len(row_offsets) != len(saved["texts"]) + 1 or len(posting_offsets) != len(
+        saved["trigrams"]
+    ) + 1:
+        return None
+    return {
+        "texts": np.asarray(saved["texts"], dtype=object),
+        "text_of_row": arrays["text_of_row"],
+        "rows_of_text": [
+            arrays["rows"][row_offsets[i] : row_offsets[i + 1]]
+            for i in range(len(saved["texts"]))
+        ],
+        "usageKeys": np.asarray(saved["usageKeys"], dtype=object),
+        "trigrams": {
+            gram: arrays["postings"][posting_offsets[i] : posting_offsets[i + 1]]
+            for i, gram in enumerate(saved["trigrams"])
+        },
+    }
+
+
+def search_text(table_name, pattern):
+    """
+    Find the rows of a table whose text (see TEXT_COLUMNS) contains a pattern, ignoring
+    case, with the same matches as `Series.str.contains(pattern, case=False, na=False)`.
+
+    Plain-text patterns of three or more characters are looked up in the table's trigram
+    index, and only the texts containing all their trigrams are checked. Other patterns
+    (regular expressions and short patterns) are checked against each distinct text.
+
+    Args:
+        table_name (str): The name of the table (a key of TEXT_COLUMNS).
+        pattern (str): The text or regular expression to search for.
+
+    Returns:
+        tuple: (texts, usageKeys, n_rows): the matching texts and their usageKeys, each
+            without duplicates in order of the rows, and the number of matching rows.
+    """
+    if store.backend == "sqlite":
+        return sql_search_text(table_name, pattern)
+
+    index = store.text_index(table_name)
+
+    candidates = range(len(index["texts"]))
+    folded = pattern.casefold()
+    if len(folded) >= 3 and REGEX_CHARACTERS.isdisjoint(pattern):
+        postings = sorted(
+            (index["trigrams"].get(gram, NO_ROWS) for gram in ngrams(folded)), key=len
+        )
+        candidates = postings[0]
+        for posting in postings[1:]:
+            candidates = np.intersect1d(candidates, posting, assume_unique=True)
+
+    regex = re.compile(pattern, re.IGNORECASE)
+    matches = [i for i in candidates if regex.search(index["texts"][i])]
+    rows = np.sort(
+        np.concatenate([NO_ROWS] + [index["rows_of_text"][i] for i in matches])
+    )
+
+    texts = pd.unique(index["texts"][index["text_of_row"][rows]]).tolist()
+    usageKeys = pd.unique(index["usageKeys"][rows]).tolist()
+    return texts, usageKeys, len(rows)
+
+
+def sql_search_text(table_name, pattern):
+    """
+    The SQLite version of `search_text()`. The texts of each table are in a
+    "<table>_text" table of the database. Plain-text patterns of three or more
+    characters are first looked up in its trigram index ("<table>_trigram", if SQLite
+    has the FTS5 trigram tokenizer), and all matches are checked with the REGEXP
+    operator.
+    """
+    # Raise the same error as search_text() for invalid patterns
+    re.compile(pattern, re.IGNORECASE)
+    connection = store.sql()
+    trigram_table = table_name + "_trigram"
+    has_trigrams = (
+        connection.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = ?", (trigram_table,)
+        ).fetchone()
+        is not None
+    )
+
+    query = (
+        f'SELECT x.text, t.usageKey FROM "{table_name}_text" x '
+        f'JOIN "{table_name}" t ON t.rowid = x.rowid '
+    )
+    params = [pattern]
+    # The trigram index folds ASCII case only, so it is not used for other patterns
+    if (
+        has_trigrams
+        and len(pattern) >= 3
+        and pattern.isascii()
+        and REGEX_CHARACTERS.isdisjoint(pattern)
+    ):
+        query += (
+            f'WHERE x.rowid IN (SELECT rowid FROM "{trigram_table}" WHERE text MATCH ?) '
         )
+        params.insert(0, '"' + pattern.replace('"', '""') + '"')
+        query += "AND x.text REGEXP ? ORDER BY x.rowid"
+    else:
+        query += "WHERE x.text REGEXP ? ORDER BY x.rowid"
+
+    rows = connection.execute(query, params).fetchall()
+    texts = list(dict.fromkeys(text for text, _ in rows))
+    usageKeys = list(dict.fromkeys(usageKey for _, usageKey in rows))
+    return texts, usageKeys, len(rows)
+
+
+def get_canonical_names(usageKeys):
+    """
+    Return the canonicalNames of a list of usageKeys, without duplicates, in the order
+    of invasive_all_source.
+    """
+    if store.backend == "sqlite":
+        species = store.rows_many("invasive_all_source", usageKeys)
+        return species.sort_index()["canonicalName"].unique().tolist()
+
+    positions = np.sort(store.positions("invasive_all_source", usageKeys))
+    return (
+        store.get("invasive_all_source")["canonicalName"]
+        .iloc[positions]
+        .unique()
+        .tolist()
+    )
 
 
 def get_taxa_by_host(host_name):
@@ -865,39 +2563,22 @@ def get_taxa_by_host(host_name):
     Returns:
         list: A list of taxa names (canonical name) for taxa associated with matches for the specified host name.
     """
-    CABI_hosts = pd.read_csv(
-        r"CABI data\CABI_tables\tohostPlants.csv", dtype={"usageKey": "str"}
-    )
-    EPPO_hosts = pd.read_csv(r"EPPO data\EPPO_hosts.csv", dtype={"usageKey": "str"})
+    # Find the host names that match, using the text index of each table
+    cabi_hosts, cabi_keys, cabi_rows = search_text("CABI_host_plants", host_name)
+    eppo_hosts, eppo_keys, eppo_rows = search_text("EPPO_hosts", host_name)
 
-    # Filter the dataframes to get rows where the host name matches
-    cabi_hosts = CABI_hosts[
-        CABI_hosts["Plant name"].str.contains(host_name, case=False, na=False)
-    ]
-    eppo_hosts = EPPO_hosts[
-        EPPO_hosts["full_name"].str.contains(host_name, case=False, na=False)
-    ]
     # Print all matched host names if either cabi_hosts or eppo_hosts has more than one match
-    if len(cabi_hosts.index) > 1 or len(eppo_hosts.index) > 1:
+    if cabi_rows > 1 or eppo_rows > 1:
         print(f"Host name '{host_name}' matched the following host species:")
-        if len(cabi_hosts) > 1:
+        if cabi_rows > 1:
             print("CABI:")
-            print(", ".join(cabi_hosts["Plant name"].unique()))
-        if len(eppo_hosts) > 1:
+            print(", ".join(cabi_hosts))
+        if eppo_rows > 1:
             print("EPPO:")
-            print(", ".join(eppo_hosts["full_name"].unique()))
-
-        # Combine the results and get unique taxa
-        combined_hosts = pd.concat([cabi_hosts, eppo_hosts])
-        taxa_keys = combined_hosts["usageKey"].unique().tolist()
-        # Get the canonicalNames associated with these usageKeys
-        taxa_list = (
-            invasive_all_source.loc[invasive_all_source["usageKey"].isin(taxa_keys)][
-                "canonicalName"
-            ]
-            .unique()
-            .tolist()
-        )
+            print(", ".join(eppo_hosts))
+
+        # Get the canonicalNames associated with the usageKeys of the matches
+        taxa_list = get_canonical_names(cabi_keys + eppo_keys)
         # Print the length of the combined list
         print(
             f"Total number of invasive taxa associated with '{host_name}': {len(taxa_list)}"
@@ -918,65 +2599,33 @@ def get_taxa_by_pathway(pathway_name):
     Returns:
         list: A list of taxa names (canonical name) for taxa associated with matches for the specified pathway name.
     """
-    CABI_pathways = pd.read_csv(
-        r"CABI data\CABI_tables\topathwayVectors.csv", dtype={"usageKey": "str"}
+    # Find the pathways that match, using the text index of each table
+    # CABI pathways are searched as "Vector: Notes" and CABI pathway causes as "Cause: Notes"
+    cabi_pathways, cabi_keys, cabi_rows = search_text(
+        "CABI_pathway_vectors", pathway_name
     )
-    DAISIE_pathways = pd.read_csv(
-        r"DAISIE data\DAISIE_pathways.csv", dtype={"usageKey": "str"}
+    daisie_pathways, daisie_keys, daisie_rows = search_text(
+        "DAISIE_pathways", pathway_name
     )
-    CABI_pathway_causes = pd.read_csv(
-        r"CABI data\CABI_tables\topathwayCauses.csv", dtype={"usageKey": "str"}
-    )
-
-    # Filter the dataframes to get rows where the pathway name matches
-    # Combine the columns "Vector" and "Notes" to create "pathway"
-    CABI_pathways["pathway"] = CABI_pathways["Vector"] + ": " + CABI_pathways["Notes"]
-    cabi_pathways = CABI_pathways[
-        CABI_pathways["pathway"].str.contains(pathway_name, case=False, na=False)
-    ]
-
-    daisie_pathways = DAISIE_pathways[
-        DAISIE_pathways["pathway"].str.contains(pathway_name, case=False, na=False)
-    ]
-    # Combine the columns "Cause" and "Notes" to create "pathway"
-    CABI_pathway_causes["pathway"] = (
-        CABI_pathway_causes["Cause"] + ": " + CABI_pathway_causes["Notes"]
+    cabi_pathway_causes, causes_keys, causes_rows = search_text(
+        "CABI_pathway_causes", pathway_name
     )
-    cabi_pathway_causes = CABI_pathway_causes[
-        CABI_pathway_causes["pathway"].str.contains(pathway_name, case=False, na=False)
-    ]
-    #
 
-    # Print all matched pathway names if any dataframe has more than one match
-    if (
-        len(cabi_pathways.index) > 1
-        or len(daisie_pathways.index) > 1
-        or len(cabi_pathway_causes.index) > 1
-    ):
+    # Print all matched pathway names if any table has more than one match
+    if cabi_rows > 1 or daisie_rows > 1 or causes_rows > 1:
         print(f"Pathway name '{pathway_name}' matched the following pathways:")
-        if len(cabi_pathways) > 1:
+        if cabi_rows > 1:
             print("CABI Pathways:")
-            print(", ".join(cabi_pathways["pathway"].unique()))
-        if len(daisie_pathways) > 1:
+            print(", ".join(cabi_pathways))
+        if daisie_rows > 1:
             print("DAISIE Pathways:")
-            print(", ".join(daisie_pathways["pathway"].unique()))
-        if len(cabi_pathway_causes) > 1:
+            print(", ".join(daisie_pathways))
+        if causes_rows > 1:
             print("CABI Pathway Causes:")
-            print(", ".join(cabi_pathway_causes["pathway"].unique()))
+            print(", ".join(cabi_pathway_causes))
 
-        # Combine the results and get unique taxa
-        combined_pathways = pd.concat(
-            [cabi_pathways, daisie_pathways, cabi_pathway_causes]
-        )
-        taxa_keys = combined_pathways["usageKey"].unique().tolist()
-        # Get the canonicalNames associated with these usageKeys
-        taxa_list = (
-            invasive_all_source.loc[invasive_all_source["usageKey"].isin(taxa_keys)][
-                "canonicalName"
-            ]
-            .unique()
-            .tolist()
-        )
+        # Get the canonicalNames associated with the usageKeys of the matches
+        taxa_list = get_canonical_names(cabi_keys + daisie_keys + causes_keys)
 
         # Print the length of the combined list
         print(
@@ -998,32 +2647,18 @@ def get_taxa_by_vector(vector_name):
     Returns:
         list: A list of taxa names (canonical name) for taxa associated with matches for the specified vector name.
     """
-    CABI_vectors = pd.read_csv(
-        r"CABI data\CABI_tables\tovectorsAndIntermediateHosts.csv",
-        dtype={"usageKey": "str"},
+    # Find the vector names that match, using the text index of the table
+    cabi_vectors, taxa_keys, cabi_rows = search_text(
+        "CABI_vectorsAndIntermediateHosts", vector_name
     )
 
-    # Filter the dataframe to get rows where the vector name matches
-    cabi_vectors = CABI_vectors[
-        CABI_vectors["Vector"].str.contains(vector_name, case=False, na=False)
-    ]
-
-    # Print all matched vector names if the dataframe has more than one match
-    if len(cabi_vectors.index) > 1:
+    # Print all matched vector names if the table has more than one match
+    if cabi_rows > 1:
         print(f"Vector name '{vector_name}' matched the following vectors:")
-        print(", ".join(cabi_vectors["Vector"].unique()))
-
-        # Get unique taxa
-        taxa_keys = cabi_vectors["usageKey"].unique().tolist()
+        print(", ".join(cabi_vectors))
 
-        # Get the canonicalNames associated with these usageKeys
-        taxa_list = (
-            invasive_all_source.loc[invasive_all_source["usageKey"].isin(taxa_keys)][
-                "canonicalName"
-            ]
-            .unique()
-            .tolist()
-        )
+        # Get the canonicalNames associated with the usageKeys of the matches
+        taxa_list = get_canonical_names(taxa_keys)
 
         # Print the length of the list
         print(
@@ -0,0 +1,99 @@
+"""
+File: tests/test_gbif_facets.py
+Author: GIATAR team
+Date created: 2026-10-17
+Description: Compare the API calls and results of the faceted and per-year GBIF count requests, on a fake GBIF API
+"""
+
+import itertools
+import random
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+import pytest
+
+from data_update import gbif_counts
+
+COUNTRIES = ["US", "FR", "DE", "CN", "AU", "BR", "IN", "ZA", "MX", "JP"]
+
+
+def occurrences(usageKey):
+    # Occurrence counts of a species by (year, country), in a few countries
+    r = random.Random(usageKey)
+    counts = {}
+    for country in r.sample(COUNTRIES, r.randint(0, 3)):
+        for year in range(1970, 2026):
+            if r.random() < 0.5:
+                counts[(year, country)] = r.randint(1, 9)
+    return counts
+
+
+@pytest.fixture
+def gbif_calls(monkeypatch):
+    """
+    Replace the GBIF API with the counts of occurrences(), and record the calls sent.
+    """
+    calls = []
+
+    def call_gbif_api(call, rate_limit=None):
+        calls.append(call)
+        query = parse_qs(urlsplit(call).query)
+        years = [int(year) for year in query["year"][0].split(",")]
+        facet = query["facet"][0]
+        totals = {}
+        for (year, country), count in occurrences(int(query["taxonKey"][0])).items():
+            if years[0] <= year <= years[-1] and query.get("country", [country])[0] == country:
+                name = country if facet == "country" else str(year)
+                totals[name] = totals.get(name, 0) + count
+        facets = sorted(totals.items(), key=lambda item: (-item[1], item[0]))
+        offset = int(query.get("facetOffset", [0])[0])
+        page = facets[offset : offset + int(query["facetlimit"][0])]
+        return [[name for name, _ in page], [count for _, count in page]]
+
+    monkeypatch.setattr(gbif_counts, "call_gbif_api", call_gbif_api)
+    return calls
+
+
+def yearly_counts(species_years):
+    # The per-year path of 2_new_gbif_obs.py
+    api_calls_df = species_years.copy()
+    api_calls_df["api_call"] = api_calls_df.apply(gbif_counts.write_gbif_counts, axis=1)
+    api_calls_df["result"] = gbif_counts.fetch_gbif_counts(
+        api_calls_df.api_call.tolist(), rate=1e6
+    )
+    api_calls_df[["country", "counts"]] = api_calls_df.result.apply(pd.Series)
+    return (
+        api_calls_df.drop(columns="result")
+        .set_index(["species", "years", "api_call"])
+        .apply(pd.Series.explode)
+        .reset_index()
+    )
+
+
+@pytest.mark.parametrize(
+    "first_year, fewer_calls",
+    [(1970, True), (2020, True), (2024, False), (2025, False)],
+)
+def test_faceted_calls(gbif_calls, first_year, fewer_calls):
+    species_years = pd.DataFrame(
+        itertools.product(range(100, 140), range(first_year, 2026)),
+        columns=["species", "years"],
+    )
+
+    expected = yearly_counts(species_years)
+    yearly_calls = len(gbif_calls)
+    gbif_calls.clear()
+
+    all_counts, failed_calls = gbif_counts.fetch_gbif_counts_faceted(
+        species_years, rate=1e6
+    )
+    faceted_calls = len(gbif_calls)
+
+    assert failed_calls == []
+    assert all_counts.astype(str).equals(expected.astype(str))
+    # Never more calls than by year, and fewer for long ranges
+    assert faceted_calls <= yearly_calls
+    if fewer_calls:
+        assert faceted_calls < yearly_calls
+    else:
+        assert faceted_calls == yearly_calls
@@ -0,0 +1,60 @@
+"""
+File: tests/test_gbif_name_cache.py
+Author: GIATAR team
+Date created: 2026-10-17
+Description: Test the GBIF name cache, and GBIF lookups when the cache can't be written
+"""
+
+import pytest
+
+from query_functions.python import GIATAR_query_functions as gqf
+
+
+@pytest.fixture
+def gbif_lookups(monkeypatch, tmp_path):
+    """
+    Point the store at an empty data folder and replace the GBIF API with a fake that
+    records the names it is sent.
+    """
+    names = []
+
+    def fetch_gbif_backbone(species_name):
+        names.append(species_name)
+        return "1" if species_name == "Malus domestica" else None
+
+    monkeypatch.setattr(gqf, "fetch_gbif_backbone", fetch_gbif_backbone)
+    monkeypatch.delenv("GIATAR_GBIF_CACHE", raising=False)
+    data_path = gqf.store._data_path
+    gqf.store.set_data_path(str(tmp_path))
+    yield names
+    gqf.store.set_data_path(data_path)
+
+
+def test_cached_lookups(gbif_lookups, tmp_path):
+    assert gqf.lookup_gbif_backbone("Malus domestica") == "1"
+    assert gqf.lookup_gbif_backbone("Not a species") is None
+    assert gqf.lookup_gbif_backbone("Malus domestica") == "1"
+    assert gqf.lookup_gbif_backbone("Not a species") is None
+    assert gbif_lookups == ["Malus domestica", "Not a species"]
+    assert (tmp_path / gqf.GBIF_CACHE_FILE).exists()
+
+
+def test_unwritable_cache(gbif_lookups, tmp_path):
+    # A path where the cache can't be created
+    (tmp_path / gqf.GBIF_CACHE_FILE).mkdir()
+
+    assert gqf.lookup_gbif_backbone("Malus domestica") == "1"
+    assert gqf.lookup_gbif_backbone("Malus domestica") == "1"
+    assert gbif_lookups == ["Malus domestica", "Malus domestica"]
+
+
+def test_cache_path_from_environment(gbif_lookups, monkeypatch, tmp_path):
+    cache = tmp_path / "elsewhere" / "names.sqlite"
+    cache.parent.mkdir()
+    monkeypatch.setenv("GIATAR_GBIF_CACHE", str(cache))
+
+    gqf.lookup_gbif_backbone("Malus domestica")
+    assert gqf.lookup_gbif_backbone("Malus domestica") == "1"
+    assert gbif_lookups == ["Malus domestica"]
+    assert cache.exists()
+    assert not (tmp_path / gqf.GBIF_CACHE_FILE).exists()
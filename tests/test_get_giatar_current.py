@@ -0,0 +1,175 @@
+"""
+File: tests/test_get_giatar_current.py
+Author: GIATAR team
+Date created: 2026-10-17
+Description: Test the resumable, checksummed and selective download of get_GIATAR_current against a local stand-in for Zenodo
+"""
+
+import hashlib
+import io
+import json
+import os
+import threading
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from query_functions.python import GIATAR_query_functions as gqf
+
+FILES = {
+    "GIATAR/occurrences/all_records.csv": "usageKey,ISO3,year\n1,USA,1990\n",
+    "GIATAR/native ranges/all_native_ranges.csv": "usageKey,ISO3\n1,FRA\n",
+    "GIATAR/traits/CABI_host_plants.csv": "usageKey,host\n1,Zea mays\n",
+}
+
+
+def make_zip(files):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as z:
+        for name, text in files.items():
+            z.writestr(name, text)
+    return buffer.getvalue()
+
+
+class ZenodoHandler(BaseHTTPRequestHandler):
+    """
+    Serve a Zenodo record of one zip file, and the zip itself with Range requests.
+    """
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        if self.path == "/api/records/1":
+            body = json.dumps(
+                {
+                    "id": 1,
+                    "metadata": {"version": server.version},
+                    "files": [
+                        {
+                            "key": "GIATAR.zip",
+                            "size": len(server.zip_bytes),
+                            "checksum": "md5:" + hashlib.md5(server.zip_bytes).hexdigest(),
+                            "links": {"self": server.url + "/files/GIATAR.zip"},
+                        }
+                    ],
+                }
+            ).encode()
+            status = 200
+        else:
+            body = server.served_bytes or server.zip_bytes
+            status = 200
+            byte_range = self.headers.get("Range")
+            server.downloads.append(byte_range)
+            if byte_range is not None:
+                body = body[int(byte_range.split("=")[1].split("-")[0]) :]
+                status = 206
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def zenodo():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ZenodoHandler)
+    server.url = f"http://127.0.0.1:{server.server_port}"
+    server.record_url = server.url + "/api/records/1"
+    server.version = "v2"
+    server.zip_bytes = make_zip(FILES)
+    # Bytes sent instead of the zip (e.g. a corrupted download), if set
+    server.served_bytes = None
+    # Range header of each download request (None for a full download)
+    server.downloads = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def extracted(data_dir):
+    return sorted(
+        os.path.relpath(os.path.join(root, name), data_dir).replace(os.sep, "/")
+        for root, _, names in os.walk(os.path.join(data_dir, "GIATAR"))
+        for name in names
+    )
+
+
+def test_download_and_skip_unchanged_version(zenodo, tmp_path):
+    manifest = gqf.get_GIATAR_current(str(tmp_path), record_url=zenodo.record_url)
+
+    assert manifest["version"] == "v2"
+    assert manifest["folders"] is None
+    assert extracted(tmp_path) == sorted(FILES)
+    assert not os.path.exists(tmp_path / "GIATAR.zip")
+    assert zenodo.downloads == [None]
+
+    # Same version: nothing is downloaded again
+    assert gqf.get_GIATAR_current(str(tmp_path), record_url=zenodo.record_url) == manifest
+    assert zenodo.downloads == [None]
+
+
+def test_resume_partial_download(zenodo, tmp_path):
+    half = len(zenodo.zip_bytes) // 2
+    (tmp_path / "GIATAR.zip.part").write_bytes(zenodo.zip_bytes[:half])
+
+    manifest = gqf.get_GIATAR_current(str(tmp_path), record_url=zenodo.record_url)
+
+    assert manifest is not None
+    assert zenodo.downloads == [f"bytes={half}-"]
+    assert extracted(tmp_path) == sorted(FILES)
+
+
+def test_select_folders(zenodo, tmp_path):
+    manifest = gqf.get_GIATAR_current(
+        str(tmp_path), folders=["occurrences"], record_url=zenodo.record_url
+    )
+    assert manifest["folders"] == ["occurrences"]
+    assert extracted(tmp_path) == ["GIATAR/occurrences/all_records.csv"]
+
+    # Folders already extracted are not downloaded again, other folders are
+    gqf.get_GIATAR_current(str(tmp_path), folders=["occurrences"], record_url=zenodo.record_url)
+    assert len(zenodo.downloads) == 1
+    manifest = gqf.get_GIATAR_current(
+        str(tmp_path), folders=["native ranges"], record_url=zenodo.record_url
+    )
+    assert manifest["folders"] == ["native ranges", "occurrences"]
+    assert len(zenodo.downloads) == 2
+    assert "GIATAR/native ranges/all_native_ranges.csv" in extracted(tmp_path)
+
+
+def test_checksum_mismatch(zenodo, tmp_path):
+    # A corrupted download is removed and reported
+    zenodo.served_bytes = bytes(len(zenodo.zip_bytes))
+    assert gqf.get_GIATAR_current(str(tmp_path), record_url=zenodo.record_url) is None
+    assert not os.path.exists(tmp_path / "GIATAR.zip")
+
+    # A kept zip of the right size that doesn't match the md5 is downloaded again
+    (tmp_path / "GIATAR.zip").write_bytes(bytes(len(zenodo.zip_bytes)))
+    zenodo.served_bytes = None
+    zenodo.downloads.clear()
+    manifest = gqf.get_GIATAR_current(str(tmp_path), record_url=zenodo.record_url)
+    assert manifest is not None
+    assert zenodo.downloads == [None]
+    assert extracted(tmp_path) == sorted(FILES)
+
+
+def test_stale_zip_without_manifest(zenodo, tmp_path):
+    # A zip kept from an older version, with no manifest
+    (tmp_path / "GIATAR.zip").write_bytes(make_zip({"GIATAR/old/old.csv": "old\n"}))
+
+    manifest = gqf.get_GIATAR_current(
+        str(tmp_path), record_url=zenodo.record_url, keep_zip=True
+    )
+
+    assert manifest["version"] == "v2"
+    assert zenodo.downloads == [None]
+    assert extracted(tmp_path) == sorted(FILES)
+    assert (tmp_path / "GIATAR.zip").read_bytes() == zenodo.zip_bytes
+
+    # The kept zip of this version is reused
+    gqf.get_GIATAR_current(str(tmp_path), record_url=zenodo.record_url, force=True)
+    assert zenodo.downloads == [None]
@@ -0,0 +1,75 @@
+"""
+File: tests/test_text_index.py
+Author: GIATAR team
+Date created: 2026-10-17
+Description: Test that text indexes are saved without pickle, and kept in memory when the data folder can't be written
+"""
+
+import os
+
+import pandas as pd
+import pytest
+
+from query_functions.python import GIATAR_query_functions as gqf
+
+HOST_PLANTS = pd.DataFrame(
+    {
+        "usageKey": ["1", "2", "2", "3", "4"],
+        "Plant name": [
+            "Malus domestica",
+            "Citrus sinensis",
+            "Citrus limon",
+            None,
+            "Malus domestica",
+        ],
+        "Plant host": ["Main", "Other", "Main", "Main", "Other"],
+    }
+)
+
+
+@pytest.fixture
+def data_path(tmp_path):
+    # A data folder with only the CABI host plants table
+    file_path = tmp_path / gqf.TABLES["CABI_host_plants"][0]
+    file_path.parent.mkdir(parents=True)
+    HOST_PLANTS.to_csv(file_path, index=False)
+    previous = gqf.store._data_path
+    gqf.store.set_data_path(str(tmp_path))
+    yield tmp_path
+    gqf.store.set_data_path(previous)
+
+
+def search(pattern):
+    texts, usageKeys, n_rows = gqf.search_text("CABI_host_plants", pattern)
+    return sorted(texts), sorted(usageKeys), n_rows
+
+
+def test_saved_index(data_path):
+    assert search("malus") == (["Malus domestica"], ["1", "4"], 2)
+    index_dir = data_path / gqf.TEXT_INDEX_DIR
+    assert sorted(os.listdir(index_dir)) == [
+        "CABI_host_plants.json",
+        "CABI_host_plants.npz",
+    ]
+
+    # Read back from the saved files, without loading the table
+    gqf.store.clear()
+    assert search("citrus") == (["Citrus limon", "Citrus sinensis"], ["2"], 2)
+    assert search("malus") == (["Malus domestica"], ["1", "4"], 2)
+    assert not gqf.store.is_loaded("CABI_host_plants")
+
+
+def test_unwritable_index_folder(data_path):
+    # A file where the text index folder would be created
+    (data_path / gqf.TEXT_INDEX_DIR).write_text("")
+    assert search("citrus") == (["Citrus limon", "Citrus sinensis"], ["2"], 2)
+
+    # A folder where one of the index files would be written
+    (data_path / gqf.TEXT_INDEX_DIR).unlink()
+    (data_path / gqf.TEXT_INDEX_DIR / "CABI_host_plants.json").mkdir(parents=True)
+    gqf.store.clear()
+    assert search("malus") == (["Malus domestica"], ["1", "4"], 2)
+    # No temporary files are left behind
+    assert not any(
+        name.endswith(".tmp") for name in os.listdir(data_path / gqf.TEXT_INDEX_DIR)
+    )